@@ -37,9 +37,9 @@ import plotly.graph_objects as go
 from database import (
     init_database, get_products, add_to_cart, get_cart_items, 
     create_order, get_user_orders, update_inventory, get_all_orders, 
-    update_order_status, auto_update_order_status
+    get_order_status_counts, update_order_status, auto_update_order_status
 )
-from chatbot import get_chatbot_response
+from chatbot import get_chatbot_response, get_chatbot_response_stream
 from ml_models import load_user_behavior_model, predict_user_behavior
 from retraining_dashboard import show_retraining_dashboard, show_training_history
 
@@ -81,6 +81,9 @@ if 'current_page' not in st.session_state:
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []  # ChatGPT conversation history
 
+if 'admin_order_pages' not in st.session_state:
+    st.session_state.admin_order_pages = [None]  # before_id of each admin order page visited
+
 def main():
     st.title("🛒 AI-Powered E-Commerce Platform")
     
@@ -157,7 +160,10 @@ def show_products_page():
         selected_category = st.selectbox("Category", categories)
     
     with col3:
-        sort_by = st.selectbox("Sort by", ["Name", "Price (Low to High)", "Price (High to Low)", "Rating"])
+        sort_options = ["Name", "Price (Low to High)", "Price (High to Low)", "Rating"]
+        if search_term:
+            sort_options.insert(0, "Relevance")
+        sort_by = st.selectbox("Sort by", sort_options)
     
     # Get products from database
     try:
@@ -365,8 +371,10 @@ def show_chat_page():
         st.session_state.chat_history.append({"role": "user", "content": user_input})
         
         try:
-            # Get AI response
-            ai_response = get_chatbot_response(user_input, st.session_state.user_id)
+            # Stream the AI response as it is generated
+            with chat_container:
+                st.write("**AI Assistant:**")
+                ai_response = st.write_stream(get_chatbot_response_stream(user_input, st.session_state.user_id))
             st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
             st.rerun()
         except Exception as e:
@@ -547,33 +555,43 @@ def show_admin_dashboard():
     with tab2:
         st.subheader("📋 Order Management")
         
-        # Get all orders
-        all_orders = get_all_orders()
+        # Order statistics are counted in SQL; only the visible page is fetched
+        status_counts = get_order_status_counts()
         
-        if all_orders:
-            # Order statistics
-            pending_orders = [o for o in all_orders if o[4] == 'Processing']
-            shipped_orders = [o for o in all_orders if o[4] == 'Shipped']
-            delivered_orders = [o for o in all_orders if o[4] == 'Delivered']
-            cancelled_orders = [o for o in all_orders if o[4] == 'Cancelled']
-            
+        if status_counts:
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("Total Orders", len(all_orders))
+                st.metric("Total Orders", sum(status_counts.values()))
             with col2:
-                st.metric("Pending Orders", len(pending_orders))
+                st.metric("Pending Orders", status_counts.get('Processing', 0))
             with col3:
-                st.metric("Shipped Orders", len(shipped_orders))
+                st.metric("Shipped Orders", status_counts.get('Shipped', 0))
             with col4:
-                st.metric("Delivered Orders", len(delivered_orders))
+                st.metric("Delivered Orders", status_counts.get('Delivered', 0))
             
             st.markdown("---")
             
             # Order management table
             st.subheader("📦 Manage Orders")
             
-            for order in all_orders[:10]:  # Show latest 10 orders
+            page_size = 10
+            order_pages = st.session_state.admin_order_pages
+            orders_page = get_all_orders(limit=page_size, before_id=order_pages[-1])
+            
+            col_newer, col_page, col_older = st.columns([1, 2, 1])
+            with col_newer:
+                if len(order_pages) > 1 and st.button("← Newer orders"):
+                    order_pages.pop()
+                    st.rerun()
+            with col_page:
+                st.caption(f"Page {len(order_pages)}")
+            with col_older:
+                if len(orders_page) == page_size and st.button("Older orders →"):
+                    order_pages.append(orders_page[-1][0])
+                    st.rerun()
+            
+            for order in orders_page:
                 order_id, user_id, order_date, total_amount, status = order
                 
                 with st.expander(f"Order #{order_id} - User {user_id} - ${total_amount:.2f} - {status}"):
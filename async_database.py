@@ -0,0 +1,68 @@
+"""
+Async read paths for the MySQL data layer
+
+Coroutine versions of the hot read queries in database.py, so a page can await
+them alongside chatbot calls (asyncio.gather) instead of blocking between them.
+The SQL is shared with database.py; only the driver differs.
+"""
+import asyncio
+import logging
+import aiomysql
+from database import DATABASE_CONFIG, build_products_query, SQL_SELECT_CART_ITEMS, SQL_SELECT_USER_ORDERS
+
+logger = logging.getLogger(__name__)
+
+# aiomysql names the schema argument "db"; LOAD DATA is never sent from here
+_POOL_CONFIG = {
+    ("db" if key == "database" else key): value
+    for key, value in DATABASE_CONFIG.items()
+    if key != "local_infile"
+}
+
+# A pool belongs to the event loop that created it (chatbot's loop thread for
+# the Streamlit pages), so it is created lazily inside that loop
+_pool = None
+_pool_lock = None
+
+async def get_pool():
+    """Get the shared aiomysql pool, creating it on first use"""
+    global _pool, _pool_lock
+    if _pool is None:
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(minsize=5, maxsize=20, autocommit=True, **_POOL_CONFIG)
+    return _pool
+
+async def _fetchall(query, params):
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+async def get_products(search_term=None, category=None, sort_by=None):
+    """Get products with optional filtering and sorting"""
+    try:
+        query, params = build_products_query(search_term, category, sort_by)
+        return await _fetchall(query, params)
+    except Exception as e:
+        logger.error(f"Error fetching products: {e}", exc_info=True)
+        return []
+
+async def get_cart_items(user_id):
+    """Get cart items for user"""
+    try:
+        return await _fetchall(SQL_SELECT_CART_ITEMS, (user_id,))
+    except Exception as e:
+        logger.error(f"Error fetching cart items: {e}", exc_info=True)
+        return []
+
+async def get_user_orders(user_id):
+    """Get orders for user"""
+    try:
+        return await _fetchall(SQL_SELECT_USER_ORDERS, (user_id,))
+    except Exception as e:
+        logger.error(f"Error fetching orders: {e}", exc_info=True)
+        return []
@@ -2,16 +2,23 @@
 Authentication module for user login/logout functionality
 """
 import hashlib
+import hmac
+import secrets
 import streamlit as st
 import json
 import os
-from database import get_connection
+from database import get_connection, invalidate_user_profile
 import logging
 
 logger = logging.getLogger(__name__)
 
 USER_DATA_FILE = "user_data.json"
 
+# Stored as "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>"; hashes without
+# the prefix are legacy unsalted SHA256 hex digests and still verify
+PASSWORD_SCHEME = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = 200_000
+
 def load_user_data():
     """Load user data from JSON file"""
     try:
@@ -89,13 +96,20 @@ def load_users_from_file_to_db():
     except Exception as e:
         logger.error(f"Error loading users from file: {e}")
 
-def hash_password(password):
-    """Hash password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+def hash_password(password, salt=None, iterations=PASSWORD_ITERATIONS):
+    """Hash password with salted PBKDF2-HMAC-SHA256 (the iteration loop runs inside OpenSSL)"""
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{PASSWORD_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
 
 def verify_password(password, hashed_password):
-    """Verify password against hash"""
-    return hash_password(password) == hashed_password
+    """Verify password against hash, in constant time"""
+    if hashed_password.startswith(PASSWORD_SCHEME + "$"):
+        _, iterations, salt, _ = hashed_password.split("$")
+        candidate = hash_password(password, bytes.fromhex(salt), int(iterations))
+    else:
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(candidate, hashed_password)
 
 def create_user(username, email, password, first_name, last_name, phone, country, city):
     """Create a new user account - with file fallback"""
@@ -250,6 +264,7 @@ def delete_user_account(user_id):
         conn.commit()
         cursor.close()
         conn.close()
+        invalidate_user_profile(user_id)
         
         return True, "Account deleted successfully"
         
@@ -0,0 +1,55 @@
+"""
+Redis read-through cache for hot point lookups
+Caching is disabled when REDIS_URL is unset or the redis client is not installed
+"""
+
+import logging
+import pickle
+from typing import Any, Awaitable, Callable, Optional
+
+from config.settings import settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_client = redis.Redis.from_url(settings.REDIS_URL) if redis is not None and settings.REDIS_URL else None
+
+
+async def get_or_set(key: str, ttl: int, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+    """Return the cached value for key, or call loader and cache a non-None result for ttl seconds
+
+    Cached values are plain data (column dicts), never ORM instances. Redis errors
+    degrade to calling the loader so the cache can never take the API down.
+    """
+    if _client is None:
+        return await loader()
+
+    try:
+        cached = await _client.get(key)
+        if cached is not None:
+            return pickle.loads(cached)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return await loader()
+
+    value = await loader()
+    if value is not None:
+        try:
+            await _client.setex(key, ttl, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+    return value
+
+
+async def invalidate(*keys: str) -> None:
+    """Drop keys after the rows behind them change"""
+    if _client is None or not keys:
+        return
+    try:
+        await _client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
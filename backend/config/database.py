@@ -1,13 +1,54 @@
 """
 Database configuration and connection management
-Simplified to use direct MySQL connection without SQLAlchemy
+SQLAlchemy sessions back the service layer; a direct MySQL connection is kept for health checks
 """
 
 import pymysql
 import logging
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from config.settings import settings
+from models.base import Base
 
 logger = logging.getLogger(__name__)
 
+
+def _engine_options():
+    """Pool and statement-cache options shared by the sync and async engines"""
+    if settings.DATABASE_EXTERNAL_POOL:
+        # The external pooler multiplexes connections; holding our own would defeat it
+        return {"poolclass": NullPool, "query_cache_size": settings.DATABASE_QUERY_CACHE_SIZE}
+    
+    return dict(
+        query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,  # fail fast instead of queueing for 30s
+        pool_pre_ping=True,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    )
+
+
+def _create_engine():
+    """Create the SQLAlchemy engine with a warm, bounded connection pool"""
+    return create_engine(settings.DATABASE_URL, **_engine_options())
+
+
+def _create_async_engine():
+    """Create the asyncio engine used by the async service layer"""
+    return create_async_engine(settings.ASYNC_DATABASE_URL, **_engine_options())
+
+
+engine = _create_engine()
+async_engine = _create_async_engine()
+
+# expire_on_commit=False keeps returned ORM objects readable after the request-level commit
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 # MySQL Database configuration
 DATABASE_CONFIG = {
     'host': 'localhost',
@@ -38,16 +79,32 @@ async def create_tables():
         pass
 
 def get_database():
-    """Database dependency for FastAPI - returns MySQL connection"""
-    conn = get_connection()
+    """Database dependency for FastAPI - yields a request-scoped session
+    
+    Services only flush their changes; the unit of work is committed once here
+    when the request succeeds and rolled back otherwise.
+    """
+    db = SessionLocal()
     try:
-        yield conn
+        yield db
+        db.commit()
     except Exception as e:
-        logger.error(f"Database connection error: {e}")
-        conn.rollback()
+        logger.error(f"Database session error: {e}")
+        db.rollback()
         raise
     finally:
-        conn.close()
+        db.close()
+
+async def get_async_database():
+    """Async database dependency for FastAPI - yields a request-scoped AsyncSession"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
 
 async def test_connection():
     """Test database connection"""
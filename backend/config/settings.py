@@ -18,6 +18,34 @@ class Settings(BaseSettings):
     DATABASE_USER: str = os.getenv("DATABASE_USER", "root")
     DATABASE_PASSWORD: str = os.getenv("DATABASE_PASSWORD", "")
     
+    # Connection pool configuration
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "20"))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    DATABASE_POOL_TIMEOUT: int = int(os.getenv("DATABASE_POOL_TIMEOUT", "5"))
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "3600"))
+    # Set when an external pooler (e.g. PgBouncer in transaction mode) fronts the database
+    DATABASE_EXTERNAL_POOL: bool = os.getenv("DATABASE_EXTERNAL_POOL", "false").lower() == "true"
+    # Compiled-statement cache entries per engine (SQLAlchemy default is 500)
+    DATABASE_QUERY_CACHE_SIZE: int = int(os.getenv("DATABASE_QUERY_CACHE_SIZE", "1200"))
+    
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """DATABASE_URL rewritten for the asyncio driver of the same backend"""
+        url = self.DATABASE_URL
+        for sync_prefix, async_prefix in (
+            ("mysql+pymysql://", "mysql+aiomysql://"),
+            ("mysql://", "mysql+aiomysql://"),
+            ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+        ):
+            if url.startswith(sync_prefix):
+                return async_prefix + url[len(sync_prefix):]
+        return url
+    
+    # Redis cache for hot product lookups (disabled when unset)
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+    PRODUCT_CACHE_TTL: int = int(os.getenv("PRODUCT_CACHE_TTL", "60"))
+    
     # API Configuration
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "AI E-Commerce Platform"
@@ -27,6 +55,7 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
     
     # OpenAI Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
@@ -3,6 +3,7 @@ Order controller for handling HTTP requests
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
 from ..config.database import get_database
@@ -16,6 +17,9 @@ from ..schemas.order_schemas import (
 )
 import math
 
+# Validates a whole page of ORM rows through one core-schema call
+_ORDER_LIST_ADAPTER = TypeAdapter(List[OrderResponseSchema])
+
 
 class OrderController:
     """Order controller for API endpoints"""
@@ -60,7 +64,7 @@ class OrderController:
             total_pages = math.ceil(total_count / page_size)
             
             return OrderListResponseSchema(
-                orders=orders,
+                orders=_ORDER_LIST_ADAPTER.validate_python(orders, from_attributes=True),
                 total_count=total_count,
                 page=page,
                 page_size=page_size,
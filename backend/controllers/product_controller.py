@@ -3,9 +3,10 @@ Product controller for handling HTTP requests
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from config.database import get_database
+from config.database import get_async_database
 from services.product_service import ProductService
 from schemas.product_schemas import (
     ProductCreateSchema,
@@ -16,6 +17,9 @@ from schemas.product_schemas import (
 )
 import math
 
+# Validates a whole page of ORM rows through one core-schema call
+_PRODUCT_LIST_ADAPTER = TypeAdapter(List[ProductResponseSchema])
+
 
 class ProductController:
     """Product controller for API endpoints"""
@@ -30,11 +34,11 @@ class ProductController:
         @self.router.post("/", response_model=ProductResponseSchema, status_code=status.HTTP_201_CREATED)
         async def create_product(
             product_data: ProductCreateSchema,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Create a new product"""
             try:
-                product = ProductService.create_product(db, product_data)
+                product = await ProductService.create_product(db, product_data)
                 return product
             except Exception as e:
                 raise HTTPException(
@@ -45,10 +49,10 @@ class ProductController:
         @self.router.get("/{product_id}", response_model=ProductResponseSchema)
         async def get_product(
             product_id: int,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Get product by ID"""
-            product = ProductService.get_product_by_id(db, product_id)
+            product = await ProductService.get_product_by_id(db, product_id)
             if not product:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -66,7 +70,7 @@ class ProductController:
             sort_order: str = "asc",
             page: int = 1,
             page_size: int = 10,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Get products with search and filtering"""
             search_params = ProductSearchSchema(
@@ -80,11 +84,11 @@ class ProductController:
                 page_size=page_size
             )
             
-            products, total_count = ProductService.get_products(db, search_params)
+            products, total_count = await ProductService.get_products(db, search_params)
             total_pages = math.ceil(total_count / page_size)
             
             return ProductListResponseSchema(
-                products=products,
+                products=_PRODUCT_LIST_ADAPTER.validate_python(products, from_attributes=True),
                 total_count=total_count,
                 page=page,
                 page_size=page_size,
@@ -95,10 +99,10 @@ class ProductController:
         async def update_product(
             product_id: int,
             product_data: ProductUpdateSchema,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Update product"""
-            product = ProductService.update_product(db, product_id, product_data)
+            product = await ProductService.update_product(db, product_id, product_data)
             if not product:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -109,10 +113,10 @@ class ProductController:
         @self.router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
         async def delete_product(
             product_id: int,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Delete product"""
-            success = ProductService.delete_product(db, product_id)
+            success = await ProductService.delete_product(db, product_id)
             if not success:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -123,11 +127,11 @@ class ProductController:
         async def update_stock(
             product_id: int,
             quantity_change: int,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Update product stock"""
             try:
-                product = ProductService.update_stock(db, product_id, quantity_change)
+                product = await ProductService.update_stock(db, product_id, quantity_change)
                 if not product:
                     raise HTTPException(
                         status_code=status.HTTP_404_NOT_FOUND,
@@ -3,8 +3,8 @@ User controller for handling HTTP requests
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..config.database import get_database
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config.database import get_async_database
 from ..services.user_service import UserService
 from ..schemas.user_schemas import (
     UserCreateSchema,
@@ -28,26 +28,26 @@ class UserController:
         @self.router.post("/register", response_model=UserResponseSchema, status_code=status.HTTP_201_CREATED)
         async def register_user(
             user_data: UserCreateSchema,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Register a new user"""
             try:
                 # Check if user already exists
-                existing_user = UserService.get_user_by_username(db, user_data.username)
+                existing_user = await UserService.get_user_by_username(db, user_data.username)
                 if existing_user:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Username already registered"
                     )
                 
-                existing_email = UserService.get_user_by_email(db, user_data.email)
+                existing_email = await UserService.get_user_by_email(db, user_data.email)
                 if existing_email:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Email already registered"
                     )
                 
-                user = UserService.create_user(db, user_data)
+                user = await UserService.create_user(db, user_data)
                 return user
             except HTTPException:
                 raise
@@ -60,10 +60,10 @@ class UserController:
         @self.router.post("/login", response_model=TokenSchema)
         async def login_user(
             login_data: UserLoginSchema,
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Authenticate user and return token"""
-            user = UserService.authenticate_user(db, login_data.username, login_data.password)
+            user = await UserService.authenticate_user(db, login_data.username, login_data.password)
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,10 +85,10 @@ class UserController:
         async def update_current_user(
             user_data: UserUpdateSchema,
             current_user = Depends(UserService.get_current_user),
-            db: Session = Depends(get_database)
+            db: AsyncSession = Depends(get_async_database)
         ):
             """Update current user profile"""
-            user = UserService.update_user(db, current_user.id, user_data)
+            user = await UserService.update_user(db, current_user.id, user_data)
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -21,7 +21,7 @@ class Order(BaseModel):
     
     # Relationships
     user = relationship("User", back_populates="orders")
-    order_items = relationship("OrderItem", back_populates="order", lazy="dynamic", cascade="all, delete-orphan")
+    order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Order(order_number='{self.order_number}', total={self.total_amount}, status='{self.status}')>"
@@ -2,7 +2,7 @@
 Product model definition
 """
 
-from sqlalchemy import Column, String, Float, Integer, Text, Enum
+from sqlalchemy import Column, String, Float, Integer, Text, Enum, Index, DDL, event, text
 from sqlalchemy.orm import relationship
 from models.base import BaseModel
 from models.enums import ProductCategoryEnum
@@ -22,7 +22,40 @@ class Product(BaseModel):
     sku = Column(String(100), unique=True, nullable=False, index=True)
     is_active = Column(Integer, default=1, nullable=False)
     
-    # Relationships will be defined after all models are created
+    __table_args__ = (
+        # Trigram indexes let PostgreSQL serve the unanchored ILIKE '%term%' search without a seq scan
+        Index("ix_product_name_trgm", "name", postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_product_desc_trgm", "description", postgresql_using="gin",
+              postgresql_ops={"description": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        # Partial indexes over active rows matching the get_products filter/sort shapes;
+        # INCLUDE makes the category/price listing an index-only scan
+        Index("ix_prod_active_cat_price", "category", "price",
+              postgresql_where=text("is_active = 1"),
+              postgresql_include=["name", "sku", "stock_quantity"]).ddl_if(dialect="postgresql"),
+        Index("ix_prod_active_name", "name",
+              postgresql_where=text("is_active = 1")).ddl_if(dialect="postgresql"),
+        Index("ix_prod_active_price", "price",
+              postgresql_where=text("is_active = 1")).ddl_if(dialect="postgresql"),
+        Index("ix_prod_active_rating", "rating",
+              postgresql_where=text("is_active = 1")).ddl_if(dialect="postgresql"),
+        Index("ix_prod_active_created", "created_at",
+              postgresql_where=text("is_active = 1")).ddl_if(dialect="postgresql"),
+    )
+    
+    # Reverse sides of the CartItem/OrderItem/UserBehavior relationships; product
+    # responses never touch them, so ProductService queries raiseload them
+    cart_items = relationship("CartItem", back_populates="product")
+    order_items = relationship("OrderItem", back_populates="product")
+    user_behaviors = relationship("UserBehavior", back_populates="product")
     
     def __repr__(self):
-        return f"<Product(name='{self.name}', price={self.price}, category='{self.category}')>"
\ No newline at end of file
+        return f"<Product(name='{self.name}', price={self.price}, category='{self.category}')>"
+
+
+# gin_trgm_ops is provided by the pg_trgm extension, which must exist before the indexes
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
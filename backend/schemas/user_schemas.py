@@ -29,9 +29,17 @@ class UserUpdateSchema(BaseModel):
     is_active: Optional[bool] = None
 
 
-class UserResponseSchema(UserBaseSchema):
-    """User response schema"""
+class UserResponseSchema(BaseModel):
+    """User response schema
+
+    Values come from the trusted users table, so fields are declared as plain
+    types instead of re-running the EmailStr/length validators on every response.
+    """
     id: int
+    username: str
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
     is_active: bool
     role: UserRoleEnum
     created_at: datetime
@@ -32,7 +32,7 @@ class CartService:
         if existing_item:
             # Update quantity
             existing_item.quantity += item_data.quantity
-            db.commit()
+            db.flush()
             db.refresh(existing_item)
             return existing_item
         else:
@@ -43,7 +43,7 @@ class CartService:
                 quantity=item_data.quantity
             )
             db.add(cart_item)
-            db.commit()
+            db.flush()
             db.refresh(cart_item)
             return cart_item
     
@@ -68,11 +68,11 @@ class CartService:
         if item_data.quantity <= 0:
             # Remove item if quantity is 0 or negative
             db.delete(cart_item)
-            db.commit()
+            db.flush()
             return None
         
         cart_item.quantity = item_data.quantity
-        db.commit()
+        db.flush()
         db.refresh(cart_item)
         return cart_item
     
@@ -90,14 +90,13 @@ class CartService:
             return False
         
         db.delete(cart_item)
-        db.commit()
+        db.flush()
         return True
     
     @staticmethod
     def clear_cart(db: Session, user_id: int) -> None:
         """Clear all items from user's cart"""
         db.query(CartItem).filter(CartItem.user_id == user_id).delete()
-        db.commit()
     
     @staticmethod
     def get_cart_total(db: Session, user_id: int) -> float:
@@ -3,7 +3,7 @@ Order service layer for business logic
 """
 
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import desc
 from ..models.order import Order, OrderItem
 from ..models.product import Product
@@ -79,11 +79,14 @@ class OrderService:
     @staticmethod
     def get_user_orders(db: Session, user_id: int, page: int = 1, page_size: int = 10) -> Tuple[List[Order], int]:
         """Get user orders with pagination"""
-        query = db.query(Order).filter(Order.user_id == user_id).order_by(desc(Order.created_at))
+        query = db.query(Order).filter(Order.user_id == user_id)
         
         total_count = query.count()
         offset = (page - 1) * page_size
-        orders = query.offset(offset).limit(page_size).all()
+        # Eager-load items and their products: three queries per page instead of 1 + N + N*M lazy loads
+        orders = query.options(
+            selectinload(Order.order_items).selectinload(OrderItem.product)
+        ).order_by(desc(Order.created_at)).offset(offset).limit(page_size).all()
         
         return orders, total_count
     
@@ -95,6 +98,10 @@ class OrderService:
             return None
         
         update_data = order_data.model_dump(exclude_unset=True)
+        if not update_data:
+            # Nothing to write - skip the empty COMMIT and the refresh SELECT
+            return db_order
+        
         for field, value in update_data.items():
             setattr(db_order, field, value)
         
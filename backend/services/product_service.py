@@ -22,12 +22,60 @@ Version: 1.0.0
 """
 
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from sqlalchemy import and_, bindparam, or_, func, insert, select, update
+from config import cache
+from config.settings import settings
 from models.product import Product
 from models.enums import ProductCategoryEnum, ProductSortByEnum, SortOrderEnum
 from schemas.product_schemas import ProductCreateSchema, ProductUpdateSchema, ProductSearchSchema
-import uuid
+import secrets
+
+
+# Resolved once at import; also restricts ORDER BY to whitelisted columns
+_SORT_COLUMNS = {
+    ProductSortByEnum.NAME: Product.name,
+    ProductSortByEnum.PRICE: Product.price,
+    ProductSortByEnum.RATING: Product.rating,
+    ProductSortByEnum.CREATED_AT: Product.created_at,
+}
+
+_ORDER_FN = {
+    SortOrderEnum.ASC: lambda column: column.asc(),
+    SortOrderEnum.DESC: lambda column: column.desc(),
+}
+
+# Product responses only serialize columns; any relationship access on a loaded
+# product is a bug (an N+1 lazy load, or MissingGreenlet under AsyncSession)
+_NO_LAZY_LOADS = raiseload("*")
+
+# Point lookups are built once at import with bound parameters, so every call
+# reuses the same statement object and hits the engine's compiled-SQL cache
+_PRODUCT_BY_ID = (
+    select(Product)
+    .where(and_(Product.id == bindparam("product_id"), Product.is_active == 1))
+    .options(_NO_LAZY_LOADS)
+)
+_PRODUCT_BY_SKU = (
+    select(Product)
+    .where(and_(Product.sku == bindparam("sku"), Product.is_active == 1))
+    .options(_NO_LAZY_LOADS)
+)
+
+
+# Rows per multi-row INSERT; keeps each statement well under driver parameter limits
+_BULK_INSERT_CHUNK = 1000
+
+
+def _generate_sku() -> str:
+    """Random SKU with the same 32 bits/8 hex chars as before, without building a full UUID4"""
+    return f"SKU-{secrets.token_hex(4).upper()}"
+
+
+def _product_cache_keys(product: Product) -> Tuple[str, str]:
+    """Cache keys under which a product's lookups are stored"""
+    return f"prod:{product.id}", f"prod_sku:{product.sku}"
 
 
 class ProductService:
@@ -38,6 +86,9 @@ class ProductService:
     ensuring data integrity, validation, and proper error handling. It serves as
     the interface between the API controllers and the database models.
     
+    All methods are coroutines running on an AsyncSession, so a request awaiting
+    the database does not block the FastAPI event loop.
+    
     Features:
     - CRUD operations with validation
     - Advanced search and filtering
@@ -47,108 +98,195 @@ class ProductService:
     """
     
     @staticmethod
-    def create_product(db: Session, product_data: ProductCreateSchema) -> Product:
+    async def create_product(db: AsyncSession, product_data: ProductCreateSchema) -> Product:
         """Create a new product"""
         # Generate unique SKU if not provided
         if not hasattr(product_data, 'sku') or not product_data.sku:
-            product_data.sku = f"SKU-{uuid.uuid4().hex[:8].upper()}"
+            product_data.sku = _generate_sku()
         
         db_product = Product(**product_data.model_dump())
         db.add(db_product)
-        db.commit()
-        db.refresh(db_product)
+        await db.commit()
+        await db.refresh(db_product)
         return db_product
     
     @staticmethod
-    def get_product_by_id(db: Session, product_id: int) -> Optional[Product]:
-        """Get product by ID"""
-        return db.query(Product).filter(
-            and_(Product.id == product_id, Product.is_active == 1)
-        ).first()
+    async def create_products_bulk(db: AsyncSession, products_data: List[ProductCreateSchema]) -> int:
+        """Create many products in one transaction (catalog imports)
+        
+        Rows go out as batched multi-row INSERTs with a single commit, instead
+        of an INSERT, COMMIT and refresh SELECT per product.
+        """
+        rows = []
+        for product_data in products_data:
+            row = product_data.model_dump()
+            if not row.get("sku"):
+                row["sku"] = _generate_sku()
+            rows.append(row)
+        
+        for start in range(0, len(rows), _BULK_INSERT_CHUNK):
+            await db.execute(insert(Product), rows[start:start + _BULK_INSERT_CHUNK])
+        await db.commit()
+        return len(rows)
     
     @staticmethod
-    def get_product_by_sku(db: Session, sku: str) -> Optional[Product]:
-        """Get product by SKU"""
-        return db.query(Product).filter(
-            and_(Product.sku == sku, Product.is_active == 1)
-        ).first()
+    async def get_product_by_id(db: AsyncSession, product_id: int) -> Optional[Product]:
+        """Get product by ID
+        
+        Read-through cached; the result may be a detached copy, so mutators load
+        the row with ``_load_product`` instead.
+        """
+        async def load():
+            product = await ProductService._load_product(db, product_id)
+            return product.to_dict() if product else None
+        
+        data = await cache.get_or_set(f"prod:{product_id}", settings.PRODUCT_CACHE_TTL, load)
+        return Product(**data) if data else None
+    
+    @staticmethod
+    async def get_product_by_sku(db: AsyncSession, sku: str) -> Optional[Product]:
+        """Get product by SKU (read-through cached, see get_product_by_id)"""
+        async def load():
+            result = await db.execute(_PRODUCT_BY_SKU, {"sku": sku})
+            product = result.scalar_one_or_none()
+            return product.to_dict() if product else None
+        
+        data = await cache.get_or_set(f"prod_sku:{sku}", settings.PRODUCT_CACHE_TTL, load)
+        return Product(**data) if data else None
     
     @staticmethod
-    def get_products(db: Session, search_params: ProductSearchSchema) -> tuple[List[Product], int]:
+    async def _load_product(db: AsyncSession, product_id: int) -> Optional[Product]:
+        """Load an active product into the session, bypassing the cache"""
+        result = await db.execute(_PRODUCT_BY_ID, {"product_id": product_id})
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_products(db: AsyncSession, search_params: ProductSearchSchema) -> tuple[List[Product], int]:
         """Get products with search, filter, and pagination"""
-        query = db.query(Product).filter(Product.is_active == 1)
+        filters = [Product.is_active == 1]
         
-        # Apply search filters
+        # Apply search filters (served by the pg_trgm GIN indexes on PostgreSQL)
         if search_params.search_term:
             search_filter = or_(
                 Product.name.ilike(f"%{search_params.search_term}%"),
                 Product.description.ilike(f"%{search_params.search_term}%")
             )
-            query = query.filter(search_filter)
+            filters.append(search_filter)
         
         if search_params.category:
-            query = query.filter(Product.category == search_params.category)
+            filters.append(Product.category == search_params.category)
         
         if search_params.min_price is not None:
-            query = query.filter(Product.price >= search_params.min_price)
+            filters.append(Product.price >= search_params.min_price)
         
         if search_params.max_price is not None:
-            query = query.filter(Product.price <= search_params.max_price)
+            filters.append(Product.price <= search_params.max_price)
         
         # Apply sorting
-        sort_column = getattr(Product, search_params.sort_by.value)
-        if search_params.sort_order == SortOrderEnum.DESC:
-            query = query.order_by(sort_column.desc())
-        else:
-            query = query.order_by(sort_column.asc())
+        sort_column = _SORT_COLUMNS[search_params.sort_by]
         
-        # Get total count before pagination
-        total_count = query.count()
-        
-        # Apply pagination
+        # Apply pagination; the total rides along on every row as a window count,
+        # so the filtered set is scanned once in a single round-trip
         offset = (search_params.page - 1) * search_params.page_size
-        products = query.offset(offset).limit(search_params.page_size).all()
+        result = await db.execute(
+            select(Product, func.count().over().label("total_count"))
+            .where(*filters)
+            .options(_NO_LAZY_LOADS)
+            .order_by(_ORDER_FN[search_params.sort_order](sort_column))
+            .offset(offset)
+            .limit(search_params.page_size)
+        )
+        rows = result.all()
+        
+        if rows:
+            products = [row[0] for row in rows]
+            total_count = rows[0].total_count
+        elif offset:
+            # Empty page past the end: the total is still needed for pagination
+            products = []
+            total_count = await db.scalar(select(func.count()).select_from(Product).where(*filters))
+        else:
+            products, total_count = [], 0
         
         return products, total_count
     
     @staticmethod
-    def update_product(db: Session, product_id: int, product_data: ProductUpdateSchema) -> Optional[Product]:
-        """Update product"""
-        db_product = ProductService.get_product_by_id(db, product_id)
-        if not db_product:
-            return None
+    async def _execute_update(db: AsyncSession, stmt, product_id: int) -> Optional[Product]:
+        """Run a single-product UPDATE, commit it and return the fresh row
         
-        update_data = product_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_product, field, value)
+        Returns None without committing when the WHERE clause matched nothing.
+        """
+        stmt = stmt.execution_options(synchronize_session=False)
+        if db.get_bind().dialect.update_returning:
+            # PostgreSQL: the updated row comes back in the same round-trip
+            result = await db.execute(
+                stmt.returning(Product),
+                execution_options={"populate_existing": True},
+            )
+            db_product = result.scalar_one_or_none()
+            if db_product is None:
+                return None
+            await db.commit()
+        else:
+            # MySQL has no UPDATE ... RETURNING; fall back to rowcount + reload
+            result = await db.execute(stmt)
+            if result.rowcount != 1:
+                return None
+            await db.commit()
+            db_product = await db.get(Product, product_id, populate_existing=True)
         
-        db.commit()
-        db.refresh(db_product)
+        await cache.invalidate(*_product_cache_keys(db_product))
         return db_product
     
     @staticmethod
-    def delete_product(db: Session, product_id: int) -> bool:
+    async def update_product(db: AsyncSession, product_id: int, product_data: ProductUpdateSchema) -> Optional[Product]:
+        """Update product
+        
+        Only the fields the client sent are written, in one UPDATE statement
+        rather than a SELECT followed by per-attribute assignment.
+        """
+        update_data = product_data.model_dump(exclude_unset=True)
+        if not update_data:
+            # Nothing to write - skip the empty COMMIT and the refresh SELECT
+            return await ProductService.get_product_by_id(db, product_id)
+        
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id, Product.is_active == 1)
+            .values(**update_data)
+        )
+        return await ProductService._execute_update(db, stmt, product_id)
+    
+    @staticmethod
+    async def delete_product(db: AsyncSession, product_id: int) -> bool:
         """Soft delete product"""
-        db_product = ProductService.get_product_by_id(db, product_id)
+        db_product = await ProductService._load_product(db, product_id)
         if not db_product:
             return False
         
         db_product.is_active = 0
-        db.commit()
+        await db.commit()
+        await cache.invalidate(*_product_cache_keys(db_product))
         return True
     
     @staticmethod
-    def update_stock(db: Session, product_id: int, quantity_change: int) -> Optional[Product]:
-        """Update product stock quantity"""
-        db_product = ProductService.get_product_by_id(db, product_id)
-        if not db_product:
-            return None
+    async def update_stock(db: AsyncSession, product_id: int, quantity_change: int) -> Optional[Product]:
+        """Update product stock quantity
         
-        new_quantity = db_product.stock_quantity + quantity_change
-        if new_quantity < 0:
-            raise ValueError("Insufficient stock")
+        The check and the write are a single conditional UPDATE, so concurrent
+        orders cannot both pass the stock check and drive the quantity negative.
+        """
+        new_quantity = Product.stock_quantity + quantity_change
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id, Product.is_active == 1, new_quantity >= 0)
+            .values(stock_quantity=new_quantity)
+        )
         
-        db_product.stock_quantity = new_quantity
-        db.commit()
-        db.refresh(db_product)
+        db_product = await ProductService._execute_update(db, stmt, product_id)
+        if db_product is None:
+            # Nothing matched: tell "not found" apart from "insufficient stock"
+            if await ProductService._load_product(db, product_id) is None:
+                return None
+            raise ValueError("Insufficient stock")
         return db_product
\ No newline at end of file
@@ -2,22 +2,90 @@
 User service layer for business logic
 """
 
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import hmac
+import threading
+import time
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+import jwt
 from datetime import datetime, timedelta
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from ..models.user import User
 from ..schemas.user_schemas import UserCreateSchema, UserUpdateSchema
 from ..config.settings import settings
-from ..config.database import get_database
+from ..config.database import get_async_database
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use argon2id; existing bcrypt hashes still verify and are re-hashed on the next login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=65536,
+    argon2__time_cost=3,
+    argon2__parallelism=4,
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__ident="2b",
+)
+# Pin the C-backed backends and load them at import (app startup) rather than on the
+# first login; fails fast if only passlib's pure-Python fallbacks are available
+pwd_context.handler("argon2").set_backend("argon2_cffi")
+pwd_context.handler("bcrypt").set_backend("bcrypt")
 security = HTTPBearer()
 
+# Point lookups built once at import so each call hits the compiled-SQL cache
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Successful password checks keyed on (HMAC of the plaintext, stored hash); the plaintext is never kept.
+# Failed attempts are not cached, so every wrong guess still pays the full hashing cost.
+_VERIFY_CACHE_SIZE = 4096
+_verified_passwords: "OrderedDict[tuple, bool]" = OrderedDict()
+_verified_passwords_lock = threading.Lock()
+
+
+# Users resolved from bearer tokens, keyed on username -> (expires_at, user).
+# Entries are short-lived and dropped whenever the user is written through this service.
+_USER_CACHE_SIZE = 10_000
+_USER_CACHE_TTL = 30.0
+_user_cache: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+
+def _invalidate_cached_user(username: str) -> None:
+    """Drop a user from the token lookup cache"""
+    with _user_cache_lock:
+        _user_cache.pop(username, None)
+
+
+@lru_cache(maxsize=16384)
+def _verify_token(token: str) -> dict:
+    """Verify a bearer token's signature and expiry once; repeat presentations hit the cache"""
+    return jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], options={"require": ["exp", "sub"]}
+    )
+
+
+def _decode_token(token: str) -> dict:
+    """Return the claims of a valid token, re-checking expiry on cached entries"""
+    claims = _verify_token(token)
+    if claims["exp"] < time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return claims
+
+
+def _password_mac(plain_password: str) -> bytes:
+    """Keyed digest used in place of the plaintext password as a cache key"""
+    return hmac.new(settings.SECRET_KEY.encode(), plain_password.encode(), hashlib.sha256).digest()
+
 
 class UserService:
     """User service for business logic operations"""
@@ -30,12 +98,38 @@ class UserService:
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify password"""
-        return pwd_context.verify(plain_password, hashed_password)
+        verified, _ = UserService.verify_and_update_password(plain_password, hashed_password)
+        return verified
     
     @staticmethod
-    def create_user(db: Session, user_data: UserCreateSchema) -> User:
+    def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify password and return a replacement hash when the stored one uses a deprecated scheme
+        
+        Recently verified credentials skip the hashing rounds entirely.
+        """
+        key = (_password_mac(plain_password), hashed_password)
+        with _verified_passwords_lock:
+            if key in _verified_passwords:
+                _verified_passwords.move_to_end(key)
+                return True, None
+        
+        verified, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+        if not verified:
+            return False, None
+        
+        # Hashes due for migration are not cached; they are replaced right after this call
+        if new_hash is None:
+            with _verified_passwords_lock:
+                _verified_passwords[key] = True
+                if len(_verified_passwords) > _VERIFY_CACHE_SIZE:
+                    _verified_passwords.popitem(last=False)
+        return True, new_hash
+    
+    @staticmethod
+    async def create_user(db: AsyncSession, user_data: UserCreateSchema) -> User:
         """Create a new user"""
-        hashed_password = UserService.get_password_hash(user_data.password)
+        # Password hashing is CPU-bound; keep it off the event loop
+        hashed_password = await run_in_threadpool(UserService.get_password_hash, user_data.password)
         db_user = User(
             username=user_data.username,
             email=user_data.email,
@@ -45,33 +139,69 @@ class UserService:
             role=user_data.role
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        _invalidate_cached_user(db_user.username)
         return db_user
     
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        result = await db.execute(_USER_BY_ID, {"user_id": user_id})
+        return result.scalar_one_or_none()
     
     @staticmethod
-    def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
         """Get user by username"""
-        return db.query(User).filter(User.username == username).first()
+        result = await db.execute(_USER_BY_USERNAME, {"username": username})
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_cached_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+        """Get user by username, served from a short TTL cache for token resolution
+        
+        The returned instance may be detached from ``db``; load the user through
+        ``get_user_by_username``/``get_user_by_id`` before modifying it.
+        """
+        now = time.monotonic()
+        with _user_cache_lock:
+            entry = _user_cache.get(username)
+            if entry is not None:
+                if entry[0] > now:
+                    return entry[1]
+                del _user_cache[username]
+        
+        user = await UserService.get_user_by_username(db, username)
+        if user is not None:
+            with _user_cache_lock:
+                _user_cache[username] = (now + _USER_CACHE_TTL, user)
+                if len(_user_cache) > _USER_CACHE_SIZE:
+                    _user_cache.popitem(last=False)
+        return user
     
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        result = await db.execute(_USER_BY_EMAIL, {"email": email})
+        return result.scalar_one_or_none()
     
     @staticmethod
-    def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+    async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
         """Authenticate user"""
-        user = UserService.get_user_by_username(db, username)
+        user = await UserService.get_user_by_username(db, username)
         if not user:
             return None
-        if not UserService.verify_password(password, user.hashed_password):
+        # Password verification is CPU-bound; keep it off the event loop
+        verified, new_hash = await run_in_threadpool(
+            UserService.verify_and_update_password, password, user.hashed_password
+        )
+        if not verified:
             return None
+        if new_hash is not None:
+            # Transparently migrate legacy bcrypt hashes to argon2id
+            user.hashed_password = new_hash
+            await db.commit()
+            _invalidate_cached_user(user.username)
         return user
     
     @staticmethod
@@ -84,11 +214,20 @@ class UserService:
         return encoded_jwt
     
     @staticmethod
-    def get_current_user(
+    async def get_current_user(
+        request: Request,
         credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_database)
+        db: AsyncSession = Depends(get_async_database)
     ) -> User:
-        """Get current user from token"""
+        """Get current user from token
+        
+        The resolved user and the token claims are kept on ``request.state`` so
+        repeated resolution within one request costs nothing.
+        """
+        current_user = getattr(request.state, "current_user", None)
+        if current_user is not None:
+            return current_user
+        
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -96,29 +235,46 @@ class UserService:
         )
         
         try:
-            payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            payload = _decode_token(credentials.credentials)
             username: str = payload.get("sub")
             if username is None:
                 raise credentials_exception
-        except JWTError:
+        except jwt.PyJWTError:
             raise credentials_exception
+        request.state.token_claims = payload
         
-        user = UserService.get_user_by_username(db, username=username)
+        user = await UserService.get_cached_user_by_username(db, username=username)
         if user is None:
             raise credentials_exception
+        request.state.current_user = user
         return user
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user_data: UserUpdateSchema) -> Optional[User]:
-        """Update user"""
-        db_user = UserService.get_user_by_id(db, user_id)
-        if not db_user:
-            return None
-        
+    async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdateSchema) -> Optional[User]:
+        """Update user with a single UPDATE of the fields the client sent"""
         update_data = user_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_user, field, value)
+        if not update_data:
+            return await UserService.get_user_by_id(db, user_id)
+        
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .execution_options(synchronize_session=False)
+        )
+        if db.get_bind().dialect.update_returning:
+            result = await db.execute(stmt.returning(User), execution_options={"populate_existing": True})
+            db_user = result.scalar_one_or_none()
+            if db_user is None:
+                return None
+            await db.commit()
+        else:
+            # MySQL has no UPDATE ... RETURNING; fall back to rowcount + reload
+            result = await db.execute(stmt)
+            if result.rowcount != 1:
+                return None
+            await db.commit()
+            db_user = await db.get(User, user_id, populate_existing=True)
         
-        db.commit()
-        db.refresh(db_user)
+        _invalidate_cached_user(db_user.username)
         return db_user
\ No newline at end of file
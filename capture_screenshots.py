@@ -10,6 +10,9 @@ Version: 1.0.0
 
 import time
 import os
+import base64
+import json
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -17,6 +20,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 import requests
 
+# Shared so repeated health checks reuse pooled keep-alive connections
+_http = requests.Session()
+
 class ScreenshotCapture:
     """Automated screenshot capture system for documentation"""
     
@@ -34,23 +40,73 @@ class ScreenshotCapture:
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--window-size=1920,1080")
+        # Surface DevTools Network events through the performance log for idle tracking
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver.execute_cdp_cmd("Network.enable", {})
         except Exception as e:
             print(f"Chrome WebDriver setup failed: {e}")
             print("Screenshots will need to be captured manually")
     
+    def wait_for_network_idle(self, timeout=10, idle_time=0.5):
+        """Block until the page is quiescent
+        
+        Quiescent means no HTTP requests in flight (tracked from DevTools Network
+        events) and no Streamlit script run in progress, both for ``idle_time``
+        seconds. Gives up silently after ``timeout`` seconds.
+        """
+        in_flight = set()
+        deadline = time.monotonic() + timeout
+        idle_since = time.monotonic()
+        
+        while time.monotonic() < deadline:
+            for entry in self.driver.get_log("performance"):
+                message = json.loads(entry["message"])["message"]
+                method = message.get("method")
+                if method == "Network.requestWillBeSent":
+                    in_flight.add(message["params"]["requestId"])
+                elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                    in_flight.discard(message["params"]["requestId"])
+            
+            # Streamlit reruns travel over its websocket, so also watch the run indicator
+            busy = in_flight or self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='stStatusWidget']")
+            now = time.monotonic()
+            if busy:
+                idle_since = now
+            elif now - idle_since >= idle_time:
+                return True
+            time.sleep(0.05)
+        return False
+    
     def wait_for_page_load(self, timeout=10):
         """Wait for page to fully load"""
         try:
             WebDriverWait(self.driver, timeout).until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
             )
-            time.sleep(2)  # Additional wait for dynamic content
+            self.wait_for_network_idle(timeout)
         except Exception as e:
             print(f"Page load timeout: {e}")
     
+    def save_page_screenshot(self, path):
+        """Write a full-page PNG straight from Chrome DevTools
+        
+        Page.captureScreenshot skips the WebDriver screenshot endpoint and returns
+        the PNG Chrome already encoded. Without a clip Chrome only returns the
+        viewport, so the clip is sized to the whole document from the layout metrics.
+        """
+        metrics = self.driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+        content = metrics.get("cssContentSize") or metrics["contentSize"]  # cssContentSize: Chrome 92+
+        result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+            "format": "png",
+            "captureBeyondViewport": True,
+            "clip": {"x": 0, "y": 0, "width": content["width"], "height": content["height"], "scale": 1},
+        })
+        with open(path, "wb") as f:
+            f.write(base64.b64decode(result["data"]))
+    
     def capture_screenshot(self, filename, element_selector=None):
         """Capture screenshot of full page or specific element"""
         try:
@@ -60,7 +116,7 @@ class ScreenshotCapture:
                 )
                 element.screenshot(os.path.join(self.output_dir, filename))
             else:
-                self.driver.save_screenshot(os.path.join(self.output_dir, filename))
+                self.save_page_screenshot(os.path.join(self.output_dir, filename))
             
             print(f"✓ Screenshot saved: {filename}")
             return True
@@ -85,7 +141,7 @@ class ScreenshotCapture:
                 search_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[type='text']")
                 if search_inputs:
                     search_inputs[0].send_keys("iPhone")
-                    time.sleep(2)
+                    self.wait_for_network_idle()
                     self.capture_screenshot("02_product_search.png")
             except Exception as e:
                 print(f"Search interaction failed: {e}")
@@ -130,14 +186,14 @@ class ScreenshotCapture:
                         text_areas = self.driver.find_elements(By.CSS_SELECTOR, "textarea")
                         if text_areas:
                             text_areas[0].send_keys("Hello, can you help me find a good laptop?")
-                            time.sleep(1)
                             
                             # Look for send button
                             buttons = self.driver.find_elements(By.CSS_SELECTOR, "button")
                             for button in buttons:
                                 if "send" in button.text.lower() or "submit" in button.text.lower():
                                     button.click()
-                                    time.sleep(3)  # Wait for response
+                                    # The model round-trip can be slow; wait for the rerun to settle
+                                    self.wait_for_network_idle(timeout=30)
                                     self.capture_screenshot("05_ai_chat_conversation.png")
                                     break
                     except Exception as e:
@@ -168,7 +224,7 @@ class ScreenshotCapture:
                         for button in predict_buttons:
                             if "predict" in button.text.lower():
                                 button.click()
-                                time.sleep(3)
+                                self.wait_for_network_idle()
                                 self.capture_screenshot("07_ml_predictions.png")
                                 break
                     except Exception as e:
@@ -192,7 +248,7 @@ class ScreenshotCapture:
                 if retraining_sections:
                     # Scroll to retraining section
                     self.driver.execute_script("arguments[0].scrollIntoView();", retraining_sections[0])
-                    time.sleep(2)
+                    self.wait_for_network_idle()
                     self.capture_screenshot("08_retraining_dashboard.png")
                     
                     # Try to interact with retraining controls
@@ -201,7 +257,7 @@ class ScreenshotCapture:
                         for button in status_buttons:
                             if "status" in button.text.lower() or "retraining" in button.text.lower():
                                 button.click()
-                                time.sleep(2)
+                                self.wait_for_network_idle()
                                 self.capture_screenshot("09_retraining_status.png")
                                 break
                     except Exception as e:
@@ -240,17 +296,25 @@ class ScreenshotCapture:
             "ML API": "http://localhost:8000/health"
         }
         
-        all_healthy = True
-        for service, url in services.items():
+        def probe(url):
             try:
-                response = requests.get(url, timeout=5)
-                if response.status_code == 200:
-                    print(f"✓ {service} is running")
-                else:
-                    print(f"✗ {service} returned status {response.status_code}")
-                    all_healthy = False
+                return _http.get(url, timeout=5), None
             except Exception as e:
-                print(f"✗ {service} is not accessible: {e}")
+                return None, e
+        
+        # Probe concurrently: total wait is the slowest service, not the sum
+        with ThreadPoolExecutor(max_workers=len(services)) as executor:
+            results = list(executor.map(probe, services.values()))
+        
+        all_healthy = True
+        for service, (response, error) in zip(services, results):
+            if error is not None:
+                print(f"✗ {service} is not accessible: {error}")
+                all_healthy = False
+            elif response.status_code == 200:
+                print(f"✓ {service} is running")
+            else:
+                print(f"✗ {service} returned status {response.status_code}")
                 all_healthy = False
         
         return all_healthy
@@ -294,23 +358,23 @@ class ScreenshotCapture:
     
     def generate_screenshot_index(self):
         """Generate an index of all captured screenshots"""
-        screenshots = []
-        for filename in os.listdir(self.output_dir):
-            if filename.endswith('.png'):
-                screenshots.append(filename)
-        
-        screenshots.sort()
+        with os.scandir(self.output_dir) as entries:
+            screenshots = sorted(
+                entry.name for entry in entries if entry.name.endswith('.png') and entry.is_file()
+            )
         
         # Create index file
-        index_content = "# Screenshot Index\n\n"
-        index_content += "This directory contains screenshots of the AI E-commerce Platform features:\n\n"
-        
-        for screenshot in screenshots:
-            name = screenshot.replace('.png', '').replace('_', ' ').title()
-            index_content += f"- **{name}**: `{screenshot}`\n"
+        parts = [
+            "# Screenshot Index\n\n",
+            "This directory contains screenshots of the AI E-commerce Platform features:\n\n",
+        ]
+        parts.extend(
+            f"- **{screenshot.replace('.png', '').replace('_', ' ').title()}**: `{screenshot}`\n"
+            for screenshot in screenshots
+        )
         
         with open(os.path.join(self.output_dir, "README.md"), 'w') as f:
-            f.write(index_content)
+            f.write("".join(parts))
         
         print(f"Screenshot index created: {self.output_dir}/README.md")
 
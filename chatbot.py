@@ -1,53 +1,216 @@
 import os
+import re
 import json
+import time
+import random
+import hashlib
+import asyncio
 import logging
-from openai import OpenAI
+import threading
+from openai import AsyncOpenAI, RateLimitError
+import llm_cache
+import async_database
+import semantic_cache
+import sentiment_classifier
 
 logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY","")
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
-def get_chatbot_response(user_message, user_id=None):
+# The async client's connection pool is bound to one event loop, so synchronous
+# callers (Streamlit reruns) all submit to a single long-lived loop thread
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name="chatbot-event-loop", daemon=True).start()
+
+def run_sync(coro):
+    """
+    Run a chatbot coroutine from synchronous code and return its result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+class OpenAIRateLimiter:
+    """
+    Token bucket paced to the account's requests-per-minute tier, plus a cap on
+    requests in flight; use as ``async with rate_limiter:`` around each API call
+    """
+    def __init__(self, qpm, max_concurrency):
+        self.rate = qpm / 60.0
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.lock = asyncio.Lock()
+    
+    async def acquire_token(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            await self.acquire_token()
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+OPENAI_QPM = int(os.environ.get("OPENAI_QPM", "500"))
+MAX_RATE_LIMIT_RETRIES = 5
+rate_limiter = OpenAIRateLimiter(OPENAI_QPM, max_concurrency=max(1, OPENAI_QPM // 60 * 2))
+
+async def _create_completion(**request):
+    """
+    Rate-limited chat completion, retried with jittered exponential backoff on 429s
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            async with rate_limiter:
+                return await async_client.chat.completions.create(**request)
+        except RateLimitError:
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            await asyncio.sleep(2 ** attempt + random.random())
+
+# In-flight model calls by key. Every coroutine runs on _loop, so the dict is
+# only touched from one thread and needs no lock.
+_inflight = {}
+
+async def _single_flight(key, coro_factory):
+    """
+    Await the in-flight call for key if there is one, otherwise start it.
+    Concurrent identical requests share one OpenAI call and its result.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield: a caller that goes away must not cancel the call others are waiting on
+    return await asyncio.shield(task)
+
+async def _cached_completion(**request):
+    """
+    Chat completion text for a deterministic request, served from llm_cache when possible
+    """
+    key = llm_cache.cache_key(request)
+    content = llm_cache.get(key)
+    if content is None:
+        content = await _single_flight(key, lambda: _complete_and_cache(key, request))
+    return content
+
+async def _complete_and_cache(key, request):
+    response = await _create_completion(**request)
+    content = response.choices[0].message.content
+    if content:
+        llm_cache.set(key, content)
+    return content
+
+# Fallback responses for common scenarios
+FALLBACK_RESPONSES = {
+    "track": "I'd be happy to help you track your order! Please provide your order number and I'll look it up for you. You can also check your order status in the Orders section of your account.",
+    "return": "Our return policy allows returns within 30 days of purchase. Items must be in original condition. You can start a return from your Orders page or contact our support team for assistance.",
+    "shipping": "We offer free shipping on orders over $50. Standard shipping takes 3-5 business days, and expedited shipping is available for faster delivery.",
+    "default": "I apologize, but I'm having trouble processing your request right now. Please try again in a moment, or contact our customer service team for immediate assistance."
+}
+
+# Group names are FALLBACK_RESPONSES keys; prefixes also match "tracking", "shipped", ...
+FALLBACK_PATTERN = re.compile(
+    r"(?P<track>track|order|status)|(?P<return>return|refund|exchange)|(?P<shipping>ship|delivery)",
+    re.IGNORECASE
+)
+
+# System prompt for e-commerce customer support. Kept byte-identical across calls
+# (nothing per-user is interpolated) so OpenAI's automatic prompt caching can
+# reuse the prefix once requests carry enough shared tokens.
+SUPPORT_SYSTEM_PROMPT = """
+    You are an AI customer support assistant for an e-commerce platform. 
+    You are helpful, friendly, and knowledgeable about:
+    - Order tracking and status
+    - Return and refund policies
+    - Product information and recommendations
+    - Account management
+    - Shipping information
+    - General shopping assistance
+    
+    Always be polite and professional. If you cannot help with something specific,
+    direct the user to contact human support. Keep responses concise but helpful.
+    
+    Company policies:
+    - Free shipping on orders over $50
+    - 30-day return policy for most items
+    - 24-48 hour processing time for orders
+    - Customer service available 24/7
+    """
+
+def _support_messages(user_message, user_id=None):
+    # User context goes in the user turn so the system prefix stays cacheable
+    user_content = user_message
+    if user_id:
+        user_content = f"User ID: {user_id}\n\n{user_message}"
+    return [
+        {"role": "system", "content": SUPPORT_SYSTEM_PROMPT},
+        {"role": "user", "content": user_content}
+    ]
+
+async def _semantic_lookup(user_message, user_id=None):
+    """
+    Return (cached_response, query_vector); both are None when the message is not cacheable
+    """
+    # Repeat intents ("track my order" / "where is my package") share one answer
+    if not semantic_cache.is_cacheable(user_message):
+        return None, None
+    try:
+        query_vector = await semantic_cache.embed(async_client, user_message)
+        cached_response = semantic_cache.lookup(query_vector)
+        if cached_response:
+            logger.info(f"Chatbot response served from semantic cache for user {user_id}")
+        return cached_response, query_vector
+    except Exception as e:
+        logger.warning(f"Semantic cache unavailable: {e}")
+        return None, None
+
+def _fallback_response(user_message):
+    # Simple keyword matching for fallback: one case-insensitive scan,
+    # the named group that matched picks the canned response
+    match = FALLBACK_PATTERN.search(user_message)
+    return FALLBACK_RESPONSES[match.lastgroup if match else "default"]
+
+async def get_chatbot_response_async(user_message, user_id=None):
     """
     Get response from ChatGPT for customer support
     """
+    # A burst of the same generic question ("what's your return policy") is
+    # answered by one call; messages with personal data are never shared. The
+    # shared answer is generated without a user ID so it never carries one
+    # caller's identity into another caller's reply
+    if semantic_cache.is_cacheable(user_message):
+        key = "support:" + hashlib.sha256(user_message.lower().strip().encode("utf-8")).hexdigest()
+        return await _single_flight(key, lambda: _generate_support_response(user_message, None))
+    return await _generate_support_response(user_message, user_id)
+
+async def _generate_support_response(user_message, user_id=None):
     try:
-        # System prompt for e-commerce customer support
-        system_prompt = """
-        You are an AI customer support assistant for an e-commerce platform. 
-        You are helpful, friendly, and knowledgeable about:
-        - Order tracking and status
-        - Return and refund policies
-        - Product information and recommendations
-        - Account management
-        - Shipping information
-        - General shopping assistance
-        
-        Always be polite and professional. If you cannot help with something specific,
-        direct the user to contact human support. Keep responses concise but helpful.
-        
-        Company policies:
-        - Free shipping on orders over $50
-        - 30-day return policy for most items
-        - 24-48 hour processing time for orders
-        - Customer service available 24/7
-        """
-        
-        # Add user context if available
-        context = ""
-        if user_id:
-            context = f"\nUser ID: {user_id}"
+        cached_response, query_vector = await _semantic_lookup(user_message, user_id)
+        if cached_response:
+            return cached_response
         
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
-        response = openai_client.chat.completions.create(
+        response = await _create_completion(
             model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt + context},
-                {"role": "user", "content": user_message}
-            ],
+            messages=_support_messages(user_message, user_id),
             max_tokens=500,
             temperature=0.7
         )
@@ -55,6 +218,8 @@ def get_chatbot_response(user_message, user_id=None):
         ai_response = response.choices[0].message.content
         if ai_response:
             ai_response = ai_response.strip()
+            if query_vector is not None:
+                semantic_cache.add(query_vector, ai_response)
         else:
             ai_response = "I apologize, but I'm having trouble processing your request right now. Please try again in a moment."
         
@@ -63,54 +228,127 @@ def get_chatbot_response(user_message, user_id=None):
         
     except Exception as e:
         logger.error(f"Chatbot error: {e}")
+        return _fallback_response(user_message)
+
+async def get_chatbot_response_stream_async(user_message, user_id=None):
+    """
+    Stream the customer support response as text chunks as soon as the model emits them
+    """
+    chunks = []
+    try:
+        cached_response, query_vector = await _semantic_lookup(user_message, user_id)
+        if cached_response:
+            yield cached_response
+            return
         
-        # Fallback responses for common scenarios
-        fallback_responses = {
-            "track": "I'd be happy to help you track your order! Please provide your order number and I'll look it up for you. You can also check your order status in the Orders section of your account.",
-            "return": "Our return policy allows returns within 30 days of purchase. Items must be in original condition. You can start a return from your Orders page or contact our support team for assistance.",
-            "shipping": "We offer free shipping on orders over $50. Standard shipping takes 3-5 business days, and expedited shipping is available for faster delivery.",
-            "default": "I apologize, but I'm having trouble processing your request right now. Please try again in a moment, or contact our customer service team for immediate assistance."
-        }
+        # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+        # do not change this unless explicitly requested by the user
+        stream = await _create_completion(
+            model="gpt-4o",
+            messages=_support_messages(user_message, user_id),
+            max_tokens=500,
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
         
-        # Simple keyword matching for fallback
-        message_lower = user_message.lower()
-        if any(word in message_lower for word in ["track", "order", "status"]):
-            return fallback_responses["track"]
-        elif any(word in message_lower for word in ["return", "refund", "exchange"]):
-            return fallback_responses["return"]
-        elif any(word in message_lower for word in ["ship", "delivery", "shipping"]):
-            return fallback_responses["shipping"]
-        else:
-            return fallback_responses["default"]
+        ai_response = "".join(chunks).strip()
+        if ai_response and query_vector is not None:
+            semantic_cache.add(query_vector, ai_response)
+        logger.info(f"Chatbot response streamed for user {user_id}")
+        
+    except Exception as e:
+        logger.error(f"Chatbot error: {e}")
+        # Text already on screen stays; only a silent failure gets the canned answer
+        if not chunks:
+            yield _fallback_response(user_message)
 
-def get_product_recommendation_response(user_preferences, user_id=None):
+# Tool the recommendation model calls to look up real catalog rows
+PRODUCT_CATEGORIES = ["Electronics", "Clothing", "Books", "Home & Garden", "Sports"]
+MAX_TOOL_PRODUCTS = 10
+MAX_TOOL_ROUNDS = 3
+SEARCH_PRODUCTS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "search_products",
+        "description": "Search the store catalog. Returns matching products, best rated first.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Keywords to match in product name or description"},
+                "category": {"type": "string", "enum": PRODUCT_CATEGORIES}
+            },
+            "required": []
+        }
+    }
+}
+
+async def _search_products(arguments):
     """
-    Get product recommendations from ChatGPT based on user preferences
+    Run a search_products tool call and return compact JSON rows for the model
+    """
+    args = json.loads(arguments or "{}")
+    rows = await async_database.get_products(
+        search_term=args.get("query") or None,
+        category=args.get("category") or None,
+        sort_by="Rating"
+    )
+    return json.dumps([
+        {"id": product_id, "name": name, "category": category, "price": float(price),
+         "rating": float(rating or 0), "in_stock": (stock or 0) > 0}
+        for product_id, name, _, price, category, stock, rating in rows[:MAX_TOOL_PRODUCTS]
+    ])
+
+async def get_product_recommendation_response_async(user_preferences, user_id=None):
+    """
+    Get product recommendations from ChatGPT based on user preferences,
+    grounded in catalog rows fetched through the search_products tool
     """
     try:
         system_prompt = """
         You are an AI shopping assistant that provides personalized product recommendations.
-        Based on user preferences, suggest relevant products from our catalog.
-        Be specific about product features and explain why you're recommending them.
-        Keep recommendations relevant to our e-commerce platform categories:
-        Electronics, Clothing, Books, Home & Garden, Sports.
+        Use the search_products tool to find products in our catalog, and only recommend
+        products it returns. Refer to products by name and keep each explanation brief.
+        Our categories are: Electronics, Clothing, Books, Home & Garden, Sports.
         """
         
         prompt = f"Based on these preferences: {user_preferences}, recommend 3 products that would be perfect for this customer. Explain why each recommendation fits their needs."
         
-        # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-        # do not change this unless explicitly requested by the user
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=600,
-            temperature=0.8
-        )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
         
-        content = response.choices[0].message.content
+        for round_number in range(MAX_TOOL_ROUNDS):
+            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+            # do not change this unless explicitly requested by the user
+            response = await _create_completion(
+                model="gpt-4o",
+                messages=messages,
+                tools=[SEARCH_PRODUCTS_TOOL],
+                # last round: answer from the rows already fetched instead of searching again
+                tool_choice="none" if round_number == MAX_TOOL_ROUNDS - 1 else "auto",
+                max_tokens=600,
+                temperature=0.8
+            )
+            
+            message = response.choices[0].message
+            if not message.tool_calls:
+                break
+            
+            messages.append(message.model_dump(exclude_none=True))
+            results = await asyncio.gather(
+                *(_search_products(call.function.arguments) for call in message.tool_calls)
+            )
+            messages.extend(
+                {"role": "tool", "tool_call_id": call.id, "content": result}
+                for call, result in zip(message.tool_calls, results)
+            )
+        
+        content = message.content
         if content:
             return content.strip()
         else:
@@ -120,10 +358,20 @@ def get_product_recommendation_response(user_preferences, user_id=None):
         logger.error(f"Product recommendation error: {e}")
         return "I'd be happy to help you find the perfect products! Could you tell me more about what you're looking for? For example, your budget, preferred category, or specific features you need?"
 
-def analyze_customer_sentiment(message):
+async def analyze_customer_sentiment_async(message):
     """
     Analyze customer sentiment to provide better support
     """
+    # The local classifier answers in milliseconds without a network call;
+    # the model round-trip below is only the fallback when it is not installed.
+    # Inference is CPU-bound, so it runs in a worker thread rather than stalling
+    # every other request and stream on this event loop
+    if sentiment_classifier.available():
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, sentiment_classifier.classify, message)
+        except Exception as e:
+            logger.error(f"Local sentiment analysis error: {e}")
+
     try:
         system_prompt = """
         Analyze the sentiment of this customer message. Respond with JSON in this format:
@@ -137,17 +385,18 @@ def analyze_customer_sentiment(message):
         
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
-        response = openai_client.chat.completions.create(
+        # temperature=0 makes the classification deterministic, so identical messages are cached
+        content = await _cached_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": message}
             ],
             response_format={"type": "json_object"},
-            max_tokens=200
+            max_tokens=200,
+            temperature=0
         )
         
-        content = response.choices[0].message.content
         if content:
             result = json.loads(content)
             return result
@@ -158,7 +407,7 @@ def analyze_customer_sentiment(message):
         logger.error(f"Sentiment analysis error: {e}")
         return {"sentiment": "neutral", "confidence": 0.5, "urgency": "medium"}
 
-def generate_personalized_email(user_id, email_type="welcome"):
+async def generate_personalized_email_async(user_id, email_type="welcome"):
     """
     Generate personalized email content using ChatGPT
     """
@@ -174,7 +423,8 @@ def generate_personalized_email(user_id, email_type="welcome"):
         
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
-        response = openai_client.chat.completions.create(
+        # The prompt depends only on email_type, so each template is generated once per TTL
+        content = await _cached_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an email marketing specialist for an e-commerce platform. Write engaging, personalized emails."},
@@ -184,7 +434,6 @@ def generate_personalized_email(user_id, email_type="welcome"):
             temperature=0.7
         )
         
-        content = response.choices[0].message.content
         if content:
             return content.strip()
         else:
@@ -193,3 +442,48 @@ def generate_personalized_email(user_id, email_type="welcome"):
     except Exception as e:
         logger.error(f"Email generation error: {e}")
         return "Thank you for choosing our platform! We're excited to serve you."
+
+# Synchronous wrappers for existing callers; use the *_async variants with
+# asyncio.gather to overlap several model calls, e.g.
+#   response, sentiment = await asyncio.gather(
+#       get_chatbot_response_async(message, user_id), analyze_customer_sentiment_async(message))
+
+def get_chatbot_response(user_message, user_id=None):
+    """
+    Get response from ChatGPT for customer support
+    """
+    return run_sync(get_chatbot_response_async(user_message, user_id))
+
+def get_chatbot_response_stream(user_message, user_id=None):
+    """
+    Stream response text from ChatGPT for customer support, e.g. st.write_stream(...)
+    """
+    stream = get_chatbot_response_stream_async(user_message, user_id)
+    try:
+        while True:
+            try:
+                yield run_sync(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        # A consumer that stops early (rerun, stop button) must still close the
+        # OpenAI stream and its connection on the loop that owns them
+        run_sync(stream.aclose())
+
+def get_product_recommendation_response(user_preferences, user_id=None):
+    """
+    Get product recommendations from ChatGPT based on user preferences
+    """
+    return run_sync(get_product_recommendation_response_async(user_preferences, user_id))
+
+def analyze_customer_sentiment(message):
+    """
+    Analyze customer sentiment to provide better support
+    """
+    return run_sync(analyze_customer_sentiment_async(message))
+
+def generate_personalized_email(user_id, email_type="welcome"):
+    """
+    Generate personalized email content using ChatGPT
+    """
+    return run_sync(generate_personalized_email_async(user_id, email_type))
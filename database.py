@@ -1,8 +1,24 @@
 import pymysql
-import pandas as pd
+import atexit
+import csv
+import functools
 import logging
+import pickle
+import queue
+import re
+import threading
+import time
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 import os
+from dbutils.pooled_db import PooledDB
+
+try:
+    import redis
+except ImportError:  # optional: caching is skipped without the client
+    redis = None
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +30,207 @@ DATABASE_CONFIG = {
     'password': '',
     'database': 'ecommerce',
     'unix_socket': '/tmp/mysql.sock',
-    'charset': 'utf8mb4'
+    'charset': 'utf8mb4',
+    'local_infile': True  # client side of LOAD DATA LOCAL INFILE for bulk_load
 }
 
+# Run on every new pooled connection. READ COMMITTED takes a fresh snapshot per
+# statement and skips InnoDB gap locks, so the short cart/order writes do not
+# block readers scanning the same ranges (the MySQL side of SQLite's WAL mode).
+# A writer blocked on a row lock fails after 5s instead of InnoDB's default 50s.
+SESSION_SETTINGS = [
+    "SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED",
+    "SET SESSION innodb_lock_wait_timeout = 5",
+]
+
+# Shared connection pool, created on first use so importing this module never
+# needs a live database; close() on a pooled connection returns it to the pool
+_pool = None
+_pool_lock = threading.Lock()
+
 def get_connection():
-    """Get database connection"""
-    return pymysql.connect(**DATABASE_CONFIG)
+    """Get database connection from the pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PooledDB(
+                    creator=pymysql,
+                    mincached=5,
+                    maxcached=20,
+                    maxconnections=50,
+                    blocking=True,
+                    ping=1,  # check liveness when a connection is taken from the pool
+                    setsession=SESSION_SETTINGS,
+                    **DATABASE_CONFIG
+                )
+    return _pool.connection()
+
+@contextmanager
+def db_cursor(cursor_class=None):
+    """Borrow a pooled connection for a read and yield a cursor on it
+
+    The cursor and connection are always closed (returning the connection to
+    the pool), including when the query raises, so a failed read can never
+    strand a pool slot. Writes that need commit/rollback still manage the
+    connection themselves.
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor(cursor_class) if cursor_class else conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+
+@contextmanager
+def db_transaction(conn=None):
+    """Borrow a pooled connection for a write and yield a cursor inside one transaction
+
+    Commits when the block finishes and rolls back if it raises; either way the
+    connection goes back to the pool. A caller-owned conn is used as is and left open.
+    """
+    owned = conn is None
+    if owned:
+        conn = get_connection()
+    try:
+        conn.begin()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    finally:
+        if owned:
+            conn.close()
+
+# Hot-path statements, defined once at import. pymysql speaks the text protocol
+# only, so these are client-side parameterised (escaped into the SQL text) rather
+# than server-side prepared statements.
+SQL_UPSERT_CART_ITEM = (
+    "INSERT INTO cart (user_id, product_id, quantity) VALUES (%s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)"
+)
+SQL_SELECT_CART_ITEMS = '''
+    SELECT c.id, p.name, p.price, c.quantity, p.id
+    FROM cart c
+    JOIN products p ON c.product_id = p.id
+    WHERE c.user_id = %s
+'''
+SQL_SELECT_USER_ORDERS = "SELECT id, created_at, total_amount, status FROM orders WHERE user_id = %s ORDER BY created_at DESC"
+SQL_INSERT_ORDER_ITEM = "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (%s, %s, %s, %s)"
+SQL_DEDUCT_ORDER_STOCK = '''
+    UPDATE products p
+    JOIN (
+        SELECT product_id, SUM(quantity) AS quantity
+        FROM order_items
+        WHERE order_id = %s
+        GROUP BY product_id
+    ) oi ON p.id = oi.product_id
+    SET p.stock_quantity = p.stock_quantity - oi.quantity
+'''
+SQL_CLEAR_CART = "DELETE FROM cart WHERE user_id = %s"
+SQL_UPDATE_ORDER_STATUS = "UPDATE orders SET status = %s WHERE id = %s"
+SQL_PRODUCTS_FINGERPRINT = "SELECT COUNT(*), MAX(updated_at) FROM products"
+SQL_INSERT_BEHAVIOR = "INSERT INTO user_behavior (user_id, action, product_id, session_duration, timestamp) VALUES (%s, %s, %s, %s, %s)"
+
+# Secondary indexes ensured on every start; MySQL has no CREATE INDEX IF NOT EXISTS
+INDEXES = [
+    # Unique: one row per (user, product) is what makes the cart upsert work
+    ("cart", "uq_cart_user_product", "CREATE UNIQUE INDEX uq_cart_user_product ON cart (user_id, product_id)"),
+    # (user_id, action) also serves user_id-only lookups and covers the per-user action counts
+    ("user_behavior", "idx_behavior_user_action", "CREATE INDEX idx_behavior_user_action ON user_behavior (user_id, action)"),
+    ("orders", "idx_orders_user_created", "CREATE INDEX idx_orders_user_created ON orders (user_id, created_at DESC)"),
+    # Per-user status lookups: the TEMP order, order history filtered to CLOSE (newest first)
+    ("orders", "idx_orders_user_status", "CREATE INDEX idx_orders_user_status ON orders (user_id, status, created_at)"),
+    ("orders", "idx_orders_status_created", "CREATE INDEX idx_orders_status_created ON orders (status, created_at)"),
+    # MAX(updated_at) for the products fingerprint is a single index lookup
+    ("products", "idx_products_updated", "CREATE INDEX idx_products_updated ON products (updated_at)"),
+    ("products", "idx_products_category", "CREATE INDEX idx_products_category ON products (category)"),
+    ("products", "ft_products", "CREATE FULLTEXT INDEX ft_products ON products (name, description)"),
+]
+
+# Indexes from earlier versions that a wider entry in INDEXES now covers;
+# dropped once their replacement exists so writes stop maintaining both
+SUPERSEDED_INDEXES = [
+    ("cart", "idx_cart_user_product"),      # -> uq_cart_user_product
+    ("user_behavior", "idx_behavior_user"), # -> idx_behavior_user_action
+]
+
+def upgrade_schema(cursor):
+    """Bring tables created by older versions in line with the columns the code uses"""
+    cursor.execute(
+        "SELECT table_name, column_name FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name IN ('products', 'users', 'favorites')"
+    )
+    columns = {(table.lower(), column.lower()) for table, column in cursor.fetchall()}
+    
+    if ('products', 'stock') in columns and ('products', 'stock_quantity') not in columns:
+        cursor.execute("ALTER TABLE products CHANGE stock stock_quantity INT DEFAULT 0")
+    
+    # init_database.py names the favorites timestamp created_at; favorites.py sorts by added_at
+    if ('favorites', 'created_at') in columns and ('favorites', 'added_at') not in columns:
+        cursor.execute("ALTER TABLE favorites CHANGE created_at added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+    
+    # Maintained by the server on every row write, whichever process makes it
+    if ('products', 'updated_at') not in columns:
+        cursor.execute("ALTER TABLE products ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)")
+    
+    for column, definition in (
+        ("street_address", "VARCHAR(255)"),
+        ("state_province", "VARCHAR(100)"),
+        ("postal_code", "VARCHAR(20)"),
+    ):
+        if ('users', column) not in columns:
+            cursor.execute(f"ALTER TABLE users ADD COLUMN {column} {definition}")
+    
+    # Carts written by the old select-then-insert path may hold the same product
+    # twice; fold duplicates into the oldest row so the unique index can be built
+    cursor.execute(
+        "SELECT 1 FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = 'cart' AND index_name = 'uq_cart_user_product' LIMIT 1"
+    )
+    if cursor.fetchone() is None:
+        cursor.execute('''
+            UPDATE cart c
+            JOIN (
+                SELECT MIN(id) AS keep_id, SUM(quantity) AS total_quantity
+                FROM cart
+                GROUP BY user_id, product_id
+                HAVING COUNT(*) > 1
+            ) d ON c.id = d.keep_id
+            SET c.quantity = d.total_quantity
+        ''')
+        cursor.execute('''
+            DELETE c FROM cart c
+            JOIN cart older ON older.user_id = c.user_id AND older.product_id = c.product_id AND older.id < c.id
+        ''')
+
+def ensure_indexes(cursor):
+    """Create any missing secondary indexes and drop superseded ones"""
+    for table, index_name, ddl in INDEXES:
+        cursor.execute(
+            "SELECT 1 FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+            (table, index_name)
+        )
+        if cursor.fetchone() is None:
+            cursor.execute(ddl)
+    
+    for table, index_name in SUPERSEDED_INDEXES:
+        cursor.execute(
+            "SELECT 1 FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+            (table, index_name)
+        )
+        if cursor.fetchone() is not None:
+            cursor.execute(f"DROP INDEX {index_name} ON {table}")
 
 def init_database():
     """Initialize database with tables and sample data"""
@@ -35,9 +246,10 @@ def init_database():
                 description TEXT,
                 price DECIMAL(10,2) NOT NULL,
                 category VARCHAR(100),
-                stock INT DEFAULT 0,
+                stock_quantity INT DEFAULT 0,
                 rating DECIMAL(3,2) DEFAULT 0.0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
             )
         ''')
         
@@ -52,6 +264,9 @@ def init_database():
                 phone VARCHAR(20),
                 country VARCHAR(100),
                 city VARCHAR(100),
+                street_address VARCHAR(255),
+                state_province VARCHAR(100),
+                postal_code VARCHAR(20),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
@@ -63,6 +278,7 @@ def init_database():
                 product_id INT,
                 quantity INT DEFAULT 1,
                 added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY uq_cart_user_product (user_id, product_id),
                 FOREIGN KEY (user_id) REFERENCES users (id),
                 FOREIGN KEY (product_id) REFERENCES products (id)
             )
@@ -104,6 +320,21 @@ def init_database():
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS favorites (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NOT NULL,
+                product_id INT NOT NULL,
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY unique_favorite (user_id, product_id),
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+                FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE
+            )
+        ''')
+        
+        upgrade_schema(cursor)
+        ensure_indexes(cursor)
+        
         conn.commit()
         
         # Check if we need to populate sample data
@@ -117,7 +348,7 @@ def init_database():
         logger.info("Database initialized successfully")
         
     except Exception as e:
-        logger.error(f"Database initialization error: {e}")
+        logger.error(f"Database initialization error: {e}", exc_info=True)
         raise
 
 def populate_sample_data(conn):
@@ -138,148 +369,294 @@ def populate_sample_data(conn):
         ("Kitchen Knife Set", "Professional chef knives with wooden block", 149.99, "Home & Garden", 12, 4.7)
     ]
     
-    cursor.executemany(
-        "INSERT INTO products (name, description, price, category, stock_quantity, rating) VALUES (%s, %s, %s, %s, %s, %s)",
-        products
-    )
+    # One transaction, one redo-log flush: products and the demo user land together or not at all
+    conn.begin()
+    try:
+        cursor.executemany(
+            "INSERT INTO products (name, description, price, category, stock_quantity, rating) VALUES (%s, %s, %s, %s, %s, %s)",
+            products
+        )
+        
+        # Sample user
+        cursor.execute("INSERT IGNORE INTO users (id, username, email) VALUES (%s, %s, %s)", (1, 'demo_user', 'demo@example.com'))
+        
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    invalidate_products_cache()
+    logger.info("Sample data populated successfully")
+
+# Shared query cache (optional). Keys embed a version number that writers bump,
+# so invalidating every cached product listing is a single INCR.
+REDIS_URL = os.environ.get("REDIS_URL")
+PRODUCTS_CACHE_TTL = 30
+PRODUCTS_VERSION_KEY = "products:version"
+_redis = redis.Redis.from_url(REDIS_URL) if redis is not None and REDIS_URL else None
+
+# Without Redis (single-process deployments) results are kept in process
+# instead: an LRU keyed on (key, local version), bumped by the same writers
+LOCAL_CACHE_SIZE = 256
+_local_cache = OrderedDict()
+_local_versions = {}
+_local_cache_lock = threading.Lock()
+
+def _local_cached_call(func, ttl, cache_key, version_key, args, kwargs):
+    with _local_cache_lock:
+        cache_key = (cache_key, _local_versions.get(version_key, 0))
+        entry = _local_cache.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            _local_cache.move_to_end(cache_key)
+            return list(entry[1])
+    
+    result = func(*args, **kwargs)
+    if result:  # errors surface as empty results; never cache those
+        with _local_cache_lock:
+            # Stored as a tuple and handed out as fresh lists, so callers can't mutate the cached rows
+            _local_cache[cache_key] = (time.monotonic() + ttl, tuple(result))
+            _local_cache.move_to_end(cache_key)
+            if len(_local_cache) > LOCAL_CACHE_SIZE:
+                _local_cache.popitem(last=False)
+    return result
+
+def redis_cached(ttl, key, version_key):
+    """Cache a function's result under key(*args, **kwargs), scoped by version_key
+
+    Uses Redis when REDIS_URL is configured, otherwise an in-process LRU.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _redis is None:
+                return _local_cached_call(func, ttl, key(*args, **kwargs), version_key, args, kwargs)
+            try:
+                version = int(_redis.get(version_key) or 0)
+                cache_key = f"{key(*args, **kwargs)}:v{version}"
+                cached = _redis.get(cache_key)
+                if cached is not None:
+                    return pickle.loads(cached)
+            except Exception as e:
+                logger.warning(f"Redis cache unavailable: {e}")
+                return func(*args, **kwargs)
+            
+            result = func(*args, **kwargs)
+            if result:  # errors surface as empty results; never cache those
+                try:
+                    _redis.setex(cache_key, ttl, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+                except Exception as e:
+                    logger.warning(f"Redis cache write failed: {e}")
+            return result
+        return wrapper
+    return decorator
+
+def invalidate_products_cache():
+    """Expire every cached product listing (call after product rows change)"""
+    if _redis is None:
+        with _local_cache_lock:
+            _local_versions[PRODUCTS_VERSION_KEY] = _local_versions.get(PRODUCTS_VERSION_KEY, 0) + 1
+        return
+    try:
+        _redis.incr(PRODUCTS_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Redis cache invalidation failed: {e}")
+
+def get_products_version():
+    """Current product data version; changes whenever invalidate_products_cache runs"""
+    if _redis is None:
+        with _local_cache_lock:
+            return _local_versions.get(PRODUCTS_VERSION_KEY, 0)
+    try:
+        return int(_redis.get(PRODUCTS_VERSION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Redis cache unavailable: {e}")
+        return 0
+
+def get_products_fingerprint():
+    """
+    (row count, last row update) of the products table, read from the server so
+    that writes from any process change it; None when the read fails
+    """
+    try:
+        with db_cursor() as cursor:
+            cursor.execute(SQL_PRODUCTS_FINGERPRINT)
+            count, last_update = cursor.fetchone()
+            return count, str(last_update)
+    except Exception as e:
+        logger.warning(f"Error reading products fingerprint: {e}")
+        return None
+
+# innodb_ft_min_token_size default; shorter words fall back to LIKE
+FULLTEXT_MIN_WORD_LENGTH = 3
+
+def build_products_query(search_term=None, category=None, sort_by=None):
+    """Build the product listing SELECT and its parameters"""
+    query = "SELECT id, name, description, price, category, stock_quantity, rating FROM products WHERE 1=1"
+    params = []
+    fulltext_query = None
     
-    # Sample user
-    cursor.execute("INSERT IGNORE INTO users (id, username, email) VALUES (%s, %s, %s)", (1, 'demo_user', 'demo@example.com'))
+    if search_term:
+        words = re.findall(r"\w+", search_term)
+        if words and all(len(word) >= FULLTEXT_MIN_WORD_LENGTH for word in words):
+            # Served by the ft_products FULLTEXT index; every word must match as a prefix
+            fulltext_query = " ".join(f"+{word}*" for word in words)
+            query += " AND MATCH(name, description) AGAINST (%s IN BOOLEAN MODE)"
+            params.append(fulltext_query)
+        else:
+            # Words shorter than innodb_ft_min_token_size are not in the FULLTEXT index
+            query += " AND (name LIKE %s OR description LIKE %s)"
+            params.extend([f"%{search_term}%", f"%{search_term}%"])
     
-    conn.commit()
-    logger.info("Sample data populated successfully")
+    if category:
+        query += " AND category = %s"
+        params.append(category)
+    
+    # Add sorting
+    if sort_by == "Relevance" and fulltext_query:
+        # Same MATCH expression as the filter, so MySQL computes the score once per row
+        query += " ORDER BY MATCH(name, description) AGAINST (%s IN BOOLEAN MODE) DESC, name ASC"
+        params.append(fulltext_query)
+    elif sort_by == "Price (Low to High)":
+        query += " ORDER BY price ASC"
+    elif sort_by == "Price (High to Low)":
+        query += " ORDER BY price DESC"
+    elif sort_by == "Rating":
+        query += " ORDER BY rating DESC"
+    else:
+        query += " ORDER BY name ASC"
+    
+    return query, params
+
+# The catalog is small and read on every page, so unsearched listings are served
+# from one in-memory snapshot of the whole table (one query per catalog version)
+# instead of one query per category/sort combination. Searches still go to the
+# FULLTEXT index.
+_CATALOG_SORT_KEYS = {
+    "Price (Low to High)": (lambda p: p[3], False),
+    "Price (High to Low)": (lambda p: p[3], True),
+    "Rating": (lambda p: p[6] or 0, True),
+}
+_CATALOG_DEFAULT_SORT = (lambda p: p[1].casefold(), False)  # ORDER BY name under a case-insensitive collation
+
+@redis_cached(ttl=PRODUCTS_CACHE_TTL, key=lambda: "products:catalog", version_key=PRODUCTS_VERSION_KEY)
+def get_catalog():
+    """Get every product row (id, name, description, price, category, stock_quantity, rating)"""
+    try:
+        with db_cursor() as cursor:
+            cursor.execute("SELECT id, name, description, price, category, stock_quantity, rating FROM products")
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error(f"Error fetching catalog: {e}", exc_info=True)
+        return []
+
+def filter_catalog(products, category=None, sort_by=None):
+    """Apply the category filter and sort order of build_products_query to catalog rows"""
+    if category:
+        products = [p for p in products if p[4] == category]
+    key, reverse = _CATALOG_SORT_KEYS.get(sort_by, _CATALOG_DEFAULT_SORT)
+    return sorted(products, key=key, reverse=reverse)
 
+@redis_cached(
+    ttl=PRODUCTS_CACHE_TTL,
+    key=lambda search_term=None, category=None, sort_by=None: f"products:{search_term}:{category}:{sort_by}",
+    version_key=PRODUCTS_VERSION_KEY,
+)
 def get_products(search_term=None, category=None, sort_by=None):
     """Get products with optional filtering and sorting"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        if not search_term:
+            return filter_catalog(get_catalog(), category, sort_by)
         
-        query = "SELECT id, name, description, price, category, stock_quantity, rating FROM products WHERE 1=1"
-        params = []
+        query, params = build_products_query(search_term, category, sort_by)
         
-        if search_term:
-            query += " AND (name LIKE %s OR description LIKE %s)"
-            params.extend([f"%{search_term}%", f"%{search_term}%"])
-        
-        if category:
-            query += " AND category = %s"
-            params.append(category)
-        
-        # Add sorting
-        if sort_by == "Price (Low to High)":
-            query += " ORDER BY price ASC"
-        elif sort_by == "Price (High to Low)":
-            query += " ORDER BY price DESC"
-        elif sort_by == "Rating":
-            query += " ORDER BY rating DESC"
-        else:
-            query += " ORDER BY name ASC"
+        with db_cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
         
-        cursor.execute(query, params)
-        products = cursor.fetchall()
-        conn.close()
+    except Exception as e:
+        logger.error(f"Error fetching products: {e}", exc_info=True)
+        return []
+
+# Columnar dtypes for DataFrame reads: float32/int32 halve the memory of the
+# numeric columns and are exact enough for prices, ratings and counts
+PRODUCT_COLUMNS = ["id", "name", "description", "price", "category", "stock_quantity", "rating"]
+PRODUCT_DTYPES = {"id": "int32", "price": "float32", "stock_quantity": "int32", "rating": "float32"}
+BEHAVIOR_DTYPES = {"purchase_count": "int32", "cart_count": "int32", "session_duration": "float32"}
+ORDER_VALUE_DTYPES = {"avg_order_value": "float32"}
+
+def get_products_df(search_term=None, category=None, sort_by=None):
+    """Get products as a DataFrame (one column per field) for vectorised filtering"""
+    import pandas as pd  # deferred: most importers of this module never build a DataFrame
+    
+    try:
+        query, params = build_products_query(search_term, category, sort_by)
         
-        return products
+        conn = get_connection()
+        try:
+            return pd.read_sql_query(query, conn, params=params, dtype=PRODUCT_DTYPES)
+        finally:
+            conn.close()
         
     except Exception as e:
-        logger.error(f"Error fetching products: {e}")
-        return []
+        logger.error(f"Error fetching products: {e}", exc_info=True)
+        return pd.DataFrame(columns=PRODUCT_COLUMNS)
 
 def add_to_cart(user_id, product_id, quantity):
     """Add item to cart"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Check if item already exists in cart
-        cursor.execute(
-            "SELECT id, quantity FROM cart WHERE user_id = %s AND product_id = %s",
-            (user_id, product_id)
-        )
-        existing_item = cursor.fetchone()
-        
-        if existing_item:
-            # Update quantity
-            new_quantity = existing_item[1] + quantity
-            cursor.execute(
-                "UPDATE cart SET quantity = %s WHERE id = %s",
-                (new_quantity, existing_item[0])
-            )
-        else:
-            # Add new item
+        # Insert the item, or add to its quantity if it is already in the cart,
+        # in one statement (atomic, so two quick clicks cannot both insert)
+        with db_transaction() as cursor:
             cursor.execute(
-                "INSERT INTO cart (user_id, product_id, quantity) VALUES (%s, %s, %s)",
+                SQL_UPSERT_CART_ITEM,
                 (user_id, product_id, quantity)
             )
         
-        conn.commit()
-        conn.close()
-        
         # Log user behavior
         log_user_behavior(user_id, "add_to_cart", product_id)
         
         return True
         
     except Exception as e:
-        logger.error(f"Error adding to cart: {e}")
+        logger.error(f"Error adding to cart: {e}", exc_info=True)
         return False
 
 def get_cart_items(user_id):
     """Get cart items for user"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT c.id, p.name, p.price, c.quantity, p.id
-            FROM cart c
-            JOIN products p ON c.product_id = p.id
-            WHERE c.user_id = %s
-        ''', (user_id,))
-        
-        items = cursor.fetchall()
-        conn.close()
-        
-        return items
+        with db_cursor() as cursor:
+            cursor.execute(SQL_SELECT_CART_ITEMS, (user_id,))
+            return cursor.fetchall()
         
     except Exception as e:
-        logger.error(f"Error fetching cart items: {e}")
+        logger.error(f"Error fetching cart items: {e}", exc_info=True)
         return []
 
 def create_order(user_id, cart_items, total_amount):
     """Create order from cart items"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Create order with timestamp
-        current_time = datetime.now().isoformat()
-        cursor.execute(
-            "INSERT INTO orders (user_id, total_amount, created_at) VALUES (%s, %s, %s)",
-            (user_id, total_amount, current_time)
-        )
-        order_id = cursor.lastrowid
-        
-        # Add order items
-        for item in cart_items:
-            cart_id, product_name, price, quantity, product_id = item
+        with db_transaction() as cursor:
+            # Create order with timestamp
+            current_time = datetime.now().isoformat()
             cursor.execute(
-                "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (%s, %s, %s, %s)",
-                (order_id, product_id, quantity, price)
+                "INSERT INTO orders (user_id, total_amount, created_at) VALUES (%s, %s, %s)",
+                (user_id, total_amount, current_time)
             )
+            order_id = cursor.lastrowid
             
-            # Update product stock
-            cursor.execute(
-                "UPDATE products SET stock = stock - %s WHERE id = %s",
-                (quantity, product_id)
+            # Add all order items in one batched INSERT
+            cursor.executemany(
+                SQL_INSERT_ORDER_ITEM,
+                [(order_id, product_id, quantity, price)
+                 for _, _, price, quantity, product_id in cart_items]
             )
-        
-        # Clear cart
-        cursor.execute("DELETE FROM cart WHERE user_id = %s", (user_id,))
-        
-        conn.commit()
-        conn.close()
+            
+            # Update product stock for every product in a single statement,
+            # driven by the order_items rows just written
+            cursor.execute(SQL_DEDUCT_ORDER_STOCK, (order_id,))
+            
+            # Clear cart
+            cursor.execute(SQL_CLEAR_CART, (user_id,))
+        invalidate_products_cache()
         
         # Log user behavior
         log_user_behavior(user_id, "purchase", None)
@@ -287,204 +664,302 @@ def create_order(user_id, cart_items, total_amount):
         return order_id
         
     except Exception as e:
-        logger.error(f"Error creating order: {e}")
+        logger.error(f"Error creating order: {e}", exc_info=True)
         return None
 
 def get_user_orders(user_id):
     """Get orders for user"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT id, created_at, total_amount, status FROM orders WHERE user_id = %s ORDER BY created_at DESC",
-            (user_id,)
-        )
-        
-        orders = cursor.fetchall()
-        conn.close()
-        
-        return orders
+        with db_cursor() as cursor:
+            cursor.execute(SQL_SELECT_USER_ORDERS, (user_id,))
+            return cursor.fetchall()
         
     except Exception as e:
-        logger.error(f"Error fetching orders: {e}")
+        logger.error(f"Error fetching orders: {e}", exc_info=True)
         return []
 
-def get_all_orders():
-    """Get all orders for admin management"""
+def get_all_orders(limit=100, before_id=None):
+    """Get one page of orders for admin management, newest first
+
+    Keyset pagination: pass the last id of the previous page as before_id.
+    Every page is a primary-key range scan, so page K costs the same as page 1.
+    """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT id, user_id, created_at, total_amount, status FROM orders ORDER BY created_at DESC"
-        )
-        
-        orders = cursor.fetchall()
-        conn.close()
-        
-        return orders
+        # Unbuffered cursor: rows stream from the server instead of being
+        # materialised in the driver before the first one is read
+        with db_cursor(pymysql.cursors.SSCursor) as cursor:
+            cursor.execute(
+                "SELECT id, user_id, created_at, total_amount, status FROM orders "
+                "WHERE (%s IS NULL OR id < %s) ORDER BY id DESC LIMIT %s",
+                (before_id, before_id, limit)
+            )
+            # Read to the end before close() so the connection goes back to the pool clean
+            return list(cursor)
         
     except Exception as e:
-        logger.error(f"Error fetching all orders: {e}")
+        logger.error(f"Error fetching all orders: {e}", exc_info=True)
         return []
 
+def get_order_status_counts():
+    """Get the number of orders in each status, e.g. {'Processing': 3, ...}"""
+    try:
+        with db_cursor() as cursor:
+            cursor.execute("SELECT status, COUNT(*) FROM orders GROUP BY status")
+            return dict(cursor.fetchall())
+        
+    except Exception as e:
+        logger.error(f"Error counting orders: {e}", exc_info=True)
+        return {}
+
 def update_order_status(order_id, new_status):
     """Update order status"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "UPDATE orders SET status = %s WHERE id = %s",
-            (new_status, order_id)
-        )
-        
-        conn.commit()
-        conn.close()
+        with db_transaction() as cursor:
+            cursor.execute(
+                SQL_UPDATE_ORDER_STATUS,
+                (new_status, order_id)
+            )
         
         return True
         
     except Exception as e:
-        logger.error(f"Error updating order status: {e}")
+        logger.error(f"Error updating order status: {e}", exc_info=True)
         return False
 
 def auto_update_order_status():
     """Automatically update orders from Processing to Delivered after 20 seconds"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Get processing orders older than 20 seconds
-        cursor.execute('''
-            SELECT id, created_at FROM orders 
-            WHERE status = 'Processing' 
-            AND datetime(created_at) <= datetime('now', '-20 seconds')
-        ''')
-        
-        old_orders = cursor.fetchall()
-        
-        # Update status to Delivered
-        for order_id, created_at in old_orders:
-            cursor.execute(
-                "UPDATE orders SET status = 'Delivered' WHERE id = %s",
-                (order_id,)
-            )
-        
-        conn.commit()
-        conn.close()
+        # One set-based UPDATE, served by idx_orders_status_created
+        with db_transaction() as cursor:
+            cursor.execute('''
+                UPDATE orders SET status = 'Delivered'
+                WHERE status = 'Processing'
+                AND created_at <= NOW() - INTERVAL 20 SECOND
+            ''')
+            updated_count = cursor.rowcount
         
-        return len(old_orders)
+        return updated_count
         
     except Exception as e:
-        logger.error(f"Error auto-updating order status: {e}")
+        logger.error(f"Error auto-updating order status: {e}", exc_info=True)
         return 0
 
 def update_inventory(product_id, new_stock):
     """Update product inventory"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "UPDATE products SET stock = %s WHERE id = %s",
-            (new_stock, product_id)
-        )
-        
-        conn.commit()
-        conn.close()
+        with db_transaction() as cursor:
+            cursor.execute(
+                "UPDATE products SET stock_quantity = %s WHERE id = %s",
+                (new_stock, product_id)
+            )
+        invalidate_products_cache()
         
         return True
         
     except Exception as e:
-        logger.error(f"Error updating inventory: {e}")
+        logger.error(f"Error updating inventory: {e}", exc_info=True)
         return False
 
-def log_user_behavior(user_id, action, product_id=None, session_duration=None):
-    """Log user behavior for ML training"""
+# Below this many rows a multi-row INSERT (what executemany sends) is as fast
+BULK_LOAD_MIN_ROWS = 1000
+
+def bulk_load(cursor, table, columns, rows, fallback_sql):
+    """Stream rows into table with LOAD DATA LOCAL INFILE
+    
+    pymysql can only send LOAD DATA from a file, so rows are spooled to a temporary
+    CSV first. Falls back to executemany(fallback_sql) when the server refuses
+    local infile (local_infile=OFF).
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8") as spool:
+        writer = csv.writer(spool, lineterminator="\n")
+        writer.writerows(["\\N" if value is None else value for value in row] for row in rows)
+        spool.flush()
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                f"({', '.join(columns)})",
+                (spool.name,)
+            )
+        except pymysql.err.MySQLError as e:
+            logger.warning(f"LOAD DATA LOCAL INFILE unavailable, using INSERT: {e}")
+            cursor.executemany(fallback_sql, rows)
+
+# Behavior events are written off the request path: producers enqueue, and one
+# background writer inserts whatever accumulated every flush interval in a batch.
+# Each event carries the time it was logged, not the time its batch was written.
+BEHAVIOR_FLUSH_INTERVAL = 0.1
+BEHAVIOR_BATCH_SIZE = 5000
+_behavior_queue = queue.Queue()
+_behavior_writer = None
+_behavior_writer_lock = threading.Lock()
+
+def _write_behavior_rows(rows, conn=None):
+    """Insert a batch of queued behavior events"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO user_behavior (user_id, action, product_id, session_duration) VALUES (%s, %s, %s, %s)",
-            (user_id, action, product_id, session_duration)
-        )
-        
-        conn.commit()
-        conn.close()
-        
+        with db_transaction(conn) as cursor:
+            if len(rows) >= BULK_LOAD_MIN_ROWS:
+                bulk_load(cursor, "user_behavior", ("user_id", "action", "product_id", "session_duration", "timestamp"),
+                          rows, fallback_sql=SQL_INSERT_BEHAVIOR)
+            else:
+                cursor.executemany(SQL_INSERT_BEHAVIOR, rows)
     except Exception as e:
-        logger.error(f"Error logging user behavior: {e}")
+        logger.error(f"Error logging user behavior ({len(rows)} events dropped): {e}", exc_info=True)
+
+def _drain_behavior_queue(block=True):
+    """Take up to one batch of queued events, waiting for the first one if block is set"""
+    rows = []
+    if block:
+        rows.append(_behavior_queue.get())
+        time.sleep(BEHAVIOR_FLUSH_INTERVAL)  # let a batch accumulate
+    while len(rows) < BEHAVIOR_BATCH_SIZE:
+        try:
+            rows.append(_behavior_queue.get_nowait())
+        except queue.Empty:
+            break
+    return rows
+
+def _connect_behavior_writer(conn):
+    """(Re)open the writer's own connection; None falls back to the pool"""
+    if conn is not None:
+        # No ping(reconnect=True): a silent reconnect would start a session
+        # without SESSION_SETTINGS, so a dead connection is replaced instead
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    try:
+        conn = pymysql.connect(**DATABASE_CONFIG)
+        with conn.cursor() as cursor:
+            for statement in SESSION_SETTINGS:
+                cursor.execute(statement)
+        return conn
+    except Exception as e:
+        logger.warning(f"Behavior writer connection unavailable, using the pool: {e}")
+        return None
+
+def _behavior_writer_loop():
+    # A dedicated connection: telemetry batches never take a pool slot from a page request
+    conn = None
+    while True:
+        rows = _drain_behavior_queue()
+        conn = _connect_behavior_writer(conn)
+        _write_behavior_rows(rows, conn)
+
+def flush_user_behavior():
+    """Synchronously write every queued behavior event (used at interpreter exit)"""
+    rows = _drain_behavior_queue(block=False)
+    while rows:
+        _write_behavior_rows(rows)
+        rows = _drain_behavior_queue(block=False)
+
+atexit.register(flush_user_behavior)
+
+def log_user_behavior(user_id, action, product_id=None, session_duration=None):
+    """Log user behavior for ML training (queued; written asynchronously in batches)"""
+    global _behavior_writer
+    if _behavior_writer is None:
+        with _behavior_writer_lock:
+            if _behavior_writer is None:
+                _behavior_writer = threading.Thread(
+                    target=_behavior_writer_loop, name="behavior-writer", daemon=True
+                )
+                _behavior_writer.start()
+    
+    _behavior_queue.put_nowait((user_id, action, product_id, session_duration, datetime.now()))
 
 def get_user_behavior_data():
     """Get user behavior data for ML training"""
+    import pandas as pd  # deferred: only the ML paths need it
+    
     try:
         conn = get_connection()
         
-        query = '''
-            SELECT ub.user_id, ub.action, ub.product_id, ub.session_duration,
-                   COUNT(CASE WHEN ub2.action = 'purchase' THEN 1 END) as purchase_count,
-                   COUNT(CASE WHEN ub2.action = 'add_to_cart' THEN 1 END) as cart_count,
-                   AVG(o.total_amount) as avg_order_value
-            FROM user_behavior ub
-            LEFT JOIN user_behavior ub2 ON ub.user_id = ub2.user_id
-            LEFT JOIN orders o ON ub.user_id = o.user_id
-            GROUP BY ub.user_id, ub.action, ub.product_id, ub.session_duration
+        # Two independent one-pass aggregates (one row per user each), merged
+        # in pandas: no join for the server to materialise, and each GROUP BY
+        # walks its own (user_id, ...) index in order. The raw events never
+        # leave MySQL, so client memory is O(distinct users) however large
+        # user_behavior grows; there is nothing left to aggregate in chunks.
+        behavior_query = '''
+            SELECT user_id,
+                   COUNT(CASE WHEN action = 'purchase' THEN 1 END) as purchase_count,
+                   COUNT(CASE WHEN action = 'add_to_cart' THEN 1 END) as cart_count,
+                   AVG(session_duration) as session_duration
+            FROM user_behavior
+            GROUP BY user_id
+        '''
+        orders_query = '''
+            SELECT user_id, AVG(total_amount) as avg_order_value
+            FROM orders
+            GROUP BY user_id
         '''
         
-        df = pd.read_sql_query(query, conn)
+        behavior = pd.read_sql_query(behavior_query, conn, dtype=BEHAVIOR_DTYPES)
+        orders = pd.read_sql_query(orders_query, conn, dtype=ORDER_VALUE_DTYPES)
         conn.close()
         
-        return df
+        df = behavior.merge(orders, on="user_id", how="left")
+        return df[["user_id", "purchase_count", "cart_count", "avg_order_value", "session_duration"]]
         
     except Exception as e:
-        logger.error(f"Error fetching behavior data: {e}")
+        logger.error(f"Error fetching behavior data: {e}", exc_info=True)
         return pd.DataFrame()
 
+# Profiles are read on nearly every authenticated page; keep them briefly in
+# memory, keyed by user_id, and drop an entry whenever that user is written
+PROFILE_CACHE_SIZE = 10_000
+PROFILE_CACHE_TTL = 60
+_profile_cache = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+def invalidate_user_profile(user_id):
+    """Drop a cached profile after the user row changes"""
+    with _profile_cache_lock:
+        _profile_cache.pop(user_id, None)
+
 def update_user_profile(user_id, first_name, last_name, email, phone, street_address, city, state_province, postal_code, country):
     """Update user profile information including address"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE users 
-            SET first_name = %s, last_name = %s, email = %s, phone = %s, 
-                street_address = %s, city = %s, state_province = %s, 
-                postal_code = %s, country = %s
-            WHERE id = %s
-        """, (first_name, last_name, email, phone, street_address, city, 
-              state_province, postal_code, country, user_id))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_transaction() as cursor:
+            cursor.execute("""
+                UPDATE users 
+                SET first_name = %s, last_name = %s, email = %s, phone = %s, 
+                    street_address = %s, city = %s, state_province = %s, 
+                    postal_code = %s, country = %s
+                WHERE id = %s
+            """, (first_name, last_name, email, phone, street_address, city, 
+                  state_province, postal_code, country, user_id))
+        invalidate_user_profile(user_id)
         
         return True, "Profile updated successfully"
         
     except Exception as e:
-        logger.error(f"Error updating user profile: {e}")
+        logger.error(f"Error updating user profile: {e}", exc_info=True)
         return False, f"Error updating profile: {str(e)}"
 
 def get_user_full_profile(user_id):
     """Get complete user profile including address"""
+    with _profile_cache_lock:
+        entry = _profile_cache.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            _profile_cache.move_to_end(user_id)
+            return dict(entry[1])
+    
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, username, email, first_name, last_name, phone, 
-                   street_address, city, state_province, postal_code, country
-            FROM users WHERE id = %s
-        """, (user_id,))
-        
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT id, username, email, first_name, last_name, phone, 
+                       street_address, city, state_province, postal_code, country
+                FROM users WHERE id = %s
+            """, (user_id,))
+            user = cursor.fetchone()
         
         if user:
-            return {
+            profile = {
                 'id': user[0],
                 'username': user[1],
                 'email': user[2],
@@ -497,9 +972,15 @@ def get_user_full_profile(user_id):
                 'postal_code': user[9] or '',
                 'country': user[10] or ''
             }
+            with _profile_cache_lock:
+                _profile_cache[user_id] = (time.monotonic() + PROFILE_CACHE_TTL, profile)
+                _profile_cache.move_to_end(user_id)
+                if len(_profile_cache) > PROFILE_CACHE_SIZE:
+                    _profile_cache.popitem(last=False)
+            return dict(profile)
         
         return None
         
     except Exception as e:
-        logger.error(f"Error fetching user profile: {e}")
+        logger.error(f"Error fetching user profile: {e}", exc_info=True)
         return None
@@ -1,30 +1,35 @@
 """
 Favorites management module
 """
-from database import get_connection
+from database import db_cursor, db_transaction
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Statements built once at import, like the hot-path SQL in database.py
+SQL_SELECT_FAVORITE = "SELECT id FROM favorites WHERE user_id = %s AND product_id = %s"
+# unique_favorite (user_id, product_id) turns a repeat add into a no-op with rowcount 0
+SQL_INSERT_FAVORITE = "INSERT IGNORE INTO favorites (user_id, product_id) VALUES (%s, %s)"
+SQL_DELETE_FAVORITE = "DELETE FROM favorites WHERE user_id = %s AND product_id = %s"
+SQL_SELECT_USER_FAVORITE_IDS = "SELECT product_id FROM favorites WHERE user_id = %s"
+SQL_SELECT_USER_FAVORITES = """
+    SELECT p.id, p.name, p.description, p.price, p.category, p.stock_quantity, p.rating
+    FROM products p
+    JOIN favorites f ON p.id = f.product_id
+    WHERE f.user_id = %s
+    ORDER BY f.added_at DESC
+"""
+
 def add_to_favorites(user_id, product_id):
     """Add product to user's favorites"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        # Add to favorites; nothing is inserted if it is already there
+        with db_transaction() as cursor:
+            cursor.execute(SQL_INSERT_FAVORITE, (user_id, product_id))
+            added = cursor.rowcount == 1
         
-        # Check if already in favorites
-        cursor.execute("SELECT id FROM favorites WHERE user_id = %s AND product_id = %s", (user_id, product_id))
-        if cursor.fetchone():
-            cursor.close()
-            conn.close()
+        if not added:
             return False, "Product already in favorites"
-        
-        # Add to favorites
-        cursor.execute("INSERT INTO favorites (user_id, product_id) VALUES (%s, %s)", (user_id, product_id))
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
         return True, "Added to favorites"
         
     except Exception as e:
@@ -34,13 +39,8 @@ def add_to_favorites(user_id, product_id):
 def remove_from_favorites(user_id, product_id):
     """Remove product from user's favorites"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM favorites WHERE user_id = %s AND product_id = %s", (user_id, product_id))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_transaction() as cursor:
+            cursor.execute(SQL_DELETE_FAVORITE, (user_id, product_id))
         
         return True, "Removed from favorites"
         
@@ -51,39 +51,31 @@ def remove_from_favorites(user_id, product_id):
 def get_user_favorites(user_id):
     """Get user's favorite products"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT p.id, p.name, p.description, p.price, p.category, p.stock, p.rating
-            FROM products p
-            JOIN favorites f ON p.id = f.product_id
-            WHERE f.user_id = %s
-            ORDER BY f.added_at DESC
-        """, (user_id,))
-        
-        favorites = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        return favorites
+        with db_cursor() as cursor:
+            cursor.execute(SQL_SELECT_USER_FAVORITES, (user_id,))
+            return cursor.fetchall()
         
     except Exception as e:
         logger.error(f"Error getting favorites: {e}")
         return []
 
+def get_user_favorite_ids(user_id):
+    """Get the set of product ids in user's favorites (one query for a whole product grid)"""
+    try:
+        with db_cursor() as cursor:
+            cursor.execute(SQL_SELECT_USER_FAVORITE_IDS, (user_id,))
+            return frozenset(row[0] for row in cursor.fetchall())
+        
+    except Exception as e:
+        logger.error(f"Error getting favorite ids: {e}")
+        return frozenset()
+
 def is_favorite(user_id, product_id):
     """Check if product is in user's favorites"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id FROM favorites WHERE user_id = %s AND product_id = %s", (user_id, product_id))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        
-        return result is not None
+        with db_cursor() as cursor:
+            cursor.execute(SQL_SELECT_FAVORITE, (user_id, product_id))
+            return cursor.fetchone() is not None
         
     except Exception as e:
         logger.error(f"Error checking favorite: {e}")
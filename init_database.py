@@ -4,7 +4,6 @@ Database initialization script for AI Shopping Platform
 Creates database, tables, and loads sample data
 """
 
-import pymysql
 import sys
 
 DATABASE_CONFIG = {
@@ -15,8 +14,14 @@ DATABASE_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# Rows per executemany call; pymysql folds each call into multi-row INSERTs,
+# and bounded batches keep packets under max_allowed_packet for large imports
+INSERT_BATCH_SIZE = 20000
+
 def get_connection(database=None):
     """Get database connection"""
+    import pymysql  # deferred so importing this module for its config stays cheap
+    
     config = DATABASE_CONFIG.copy()
     if database:
         config['database'] = database
@@ -69,7 +74,8 @@ def create_tables():
                 category VARCHAR(100) NOT NULL,
                 stock_quantity INT NOT NULL DEFAULT 0,
                 rating DECIMAL(3,2) DEFAULT 4.0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
             )
         """)
         
@@ -167,8 +173,20 @@ def insert_sample_products():
             VALUES (%s, %s, %s, %s, %s, %s)
         """
         
-        cursor.executemany(insert_query, products)
-        conn.commit()
+        # All batches commit as one transaction
+        # Seed rows are trusted: skip per-row unique and foreign key checks for the
+        # duration of the load (MySQL's bulk-load advice), restored afterwards
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        conn.begin()
+        try:
+            for start in range(0, len(products), INSERT_BATCH_SIZE):
+                cursor.executemany(insert_query, products[start:start + INSERT_BATCH_SIZE])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1")
         
         print(f"✅ Inserted {len(products)} sample products")
         cursor.close()
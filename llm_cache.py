@@ -0,0 +1,53 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Exact-match cache for deterministic chat completions.
+# Keys are a SHA256 of the full request (model, messages, sampling params), values
+# are the response text; entries expire after a TTL and the oldest are evicted first.
+MAX_ENTRIES = 4096
+TTL_SECONDS = 3600
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+def cache_key(request):
+    """
+    Stable key for a chat completion request
+    """
+    payload = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get(key):
+    """
+    Return the cached response text, or None on a miss or expired entry
+    """
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return value
+
+def set(key, value, ttl=TTL_SECONDS):
+    """
+    Store response text for key
+    """
+    with _lock:
+        _entries[key] = (time.monotonic() + ttl, value)
+        _entries.move_to_end(key)
+        if len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+def clear():
+    """
+    Drop every cached response
+    """
+    with _lock:
+        _entries.clear()
@@ -5,19 +5,22 @@ Meeting all project requirements with proper page structure and authentication
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import hashlib
+import copy
 
 # Import custom modules
-from database import get_products, get_connection, update_user_profile, get_user_full_profile
+from database import get_products, get_products_version, get_products_fingerprint, update_user_profile, get_user_full_profile
 from auth import create_user, authenticate_user, get_user_by_id, delete_user_account, load_users_from_file_to_db
-from favorites import add_to_favorites, remove_from_favorites, get_user_favorites, is_favorite
+from favorites import add_to_favorites, remove_from_favorites, get_user_favorites, get_user_favorite_ids
 from order_management import (
     add_item_to_temp_order, get_temp_order, complete_order, 
-    get_user_orders, get_order_items, remove_item_from_temp_order,
+    get_user_orders, get_user_order_items, remove_item_from_temp_order,
     get_combined_user_orders, load_user_orders_from_file
 )
-from chatbot import get_chatbot_response
+from chatbot import get_chatbot_response_stream
+from product_filters import compile_search, use_fused_range_filter, and_price_stock_mask
 
 # Configure page
 st.set_page_config(
@@ -34,19 +37,126 @@ if 'users_loaded' not in st.session_state:
     except Exception as e:
         st.session_state.users_loaded = False
 
-# Initialize session state
-if 'logged_in' not in st.session_state:
-    st.session_state.logged_in = False
-if 'user_id' not in st.session_state:
-    st.session_state.user_id = None
-if 'user_info' not in st.session_state:
-    st.session_state.user_info = None
-if 'current_page' not in st.session_state:
-    st.session_state.current_page = "Main"
-if 'chat_prompts_count' not in st.session_state:
-    st.session_state.chat_prompts_count = 0
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+# Initialize session state (copied so no two sessions share a mutable default)
+SESSION_DEFAULTS = {
+    'logged_in': False,
+    'user_id': None,
+    'user_info': None,
+    'current_page': "Main",
+    'chat_prompts_count': 0,
+    'chat_history': [],
+}
+for key, value in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, copy.copy(value))
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False)
+def _cached_products(version):
+    """Product rows for one data version; any stock or catalog write starts a new version"""
+    return get_products()
+
+def cached_products():
+    """Product rows, fetched at most once per data version across reruns and sessions"""
+    products = _cached_products(get_products_version())
+    if not products:
+        _cached_products.clear()  # don't keep serving an empty result from a failed read
+    return products
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False)
+def _chat_product_context(version):
+    """Chat prompt product list for one data version (the cache key); the same for every user"""
+    products = cached_products()
+    if not products:
+        return ""
+    product_list = [f"- {p[1]}: ${p[3]:.2f}, Stock: {p[5]}" for p in products[:10]]
+    return "Available products:\n" + "\n".join(product_list)
+
+def chat_product_context():
+    """Product list for the chat prompt, formatted at most once per data version"""
+    context = _chat_product_context(get_products_version())
+    if not context:
+        _chat_product_context.clear()  # retry the read on the next question
+    return context
+
+PRODUCT_COLUMNS = ['ID', 'Name', 'Description', 'Price', 'Category', 'Stock', 'Rating']
+# Compact dtypes: 32-bit numbers and a categorical for the handful of category names
+PRODUCT_DTYPES = {'ID': 'int32', 'Price': 'float32', 'Stock': 'int32', 'Rating': 'float32', 'Category': 'category'}
+
+# Fields a product card shows, in the order _render_product_card unpacks them
+CARD_COLUMNS = ['ID', 'Name', '_price_str', 'Stock', '_rating_str', 'Category']
+
+def products_frame(rows):
+    """
+    Product rows (id, name, description, price, category, stock, rating) as a typed DataFrame,
+    with the card's price and rating text formatted column-wise up front
+    """
+    df = pd.DataFrame(rows, columns=PRODUCT_COLUMNS).astype(PRODUCT_DTYPES)
+    df['_price_str'] = df['Price'].map("${:.2f}".format)
+    df['_rating_str'] = df['Rating'].astype(str) + '/5'
+    return df
+
+def _build_products_df():
+    df = products_frame(get_products())
+    df['_name_lower'] = df['Name'].str.lower()  # lowercased once, not on every keystroke
+    return df
+
+@st.cache_data(persist="disk", max_entries=4, show_spinner=False)
+def _disk_products_df(fingerprint):
+    """
+    Product DataFrame pickled to disk so it survives restarts. Keyed on the products
+    table's server-side fingerprint, not the data version: the version restarts at 0
+    with the process (or a Redis flush) and misses writes made by other processes
+    """
+    return _build_products_df()
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False)
+def _cached_products_df(version):
+    """Product DataFrame for one data version, built and downcast once (or loaded from disk)"""
+    fingerprint = get_products_fingerprint()
+    if fingerprint is None:
+        return _build_products_df()  # can't tell whether a disk copy is current
+    return _disk_products_df(fingerprint)
+
+@st.cache_data(ttl=300, max_entries=8, show_spinner=False)
+def _cached_sort_index(version, column):
+    """(row positions ordered by column, column values in that order) for one data version"""
+    values = _cached_products_df(version)[column].to_numpy()
+    order = np.argsort(values, kind='stable')
+    return order, values[order]
+
+# Filter choice -> (low, low inclusive, high, high inclusive); None means unbounded
+PRICE_BOUNDS = {
+    "< $50": (None, False, 50, False),
+    "$50-$100": (50, True, 100, True),
+    "$100-$200": (100, True, 200, True),
+    "> $200": (200, False, None, False),
+}
+STOCK_BOUNDS = {
+    "In Stock (>0)": (0, False, None, False),
+    "Low Stock (<10)": (None, False, 10, False),
+    "High Stock (>50)": (50, False, None, False),
+}
+
+def range_rows(column, bounds):
+    """Row positions of the cached products in a value range (in column order), via binary search on the sorted column"""
+    order, sorted_values = _cached_sort_index(get_products_version(), column)
+    low, low_inclusive, high, high_inclusive = bounds
+    start = 0 if low is None else np.searchsorted(sorted_values, low, side='left' if low_inclusive else 'right')
+    stop = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side='right' if high_inclusive else 'left')
+    return order[start:stop]
+
+def range_mask(column, bounds):
+    """Boolean row mask over the cached products for a value range"""
+    mask = np.zeros(len(_cached_sort_index(get_products_version(), column)[0]), dtype=bool)
+    mask[range_rows(column, bounds)] = True
+    return mask
+
+def cached_products_df():
+    """Product DataFrame shared across reruns; st.cache_data hands each caller its own copy"""
+    df = _cached_products_df(get_products_version())
+    if df.empty:
+        _cached_products_df.clear()
+        _disk_products_df.clear()
+    return df
 
 def login_page():
     """User authentication page"""
@@ -92,37 +202,160 @@ def login_page():
     
     with tab2:
         st.subheader("Create New Account")
-        with st.form("register_form"):
-            col1, col2 = st.columns(2)
-            with col1:
-                first_name = st.text_input("First Name*")
-                last_name = st.text_input("Last Name*")
-                username = st.text_input("Username*")
-                email = st.text_input("Email*")
-            with col2:
-                phone = st.text_input("Phone*")
-                country = st.text_input("Country*")
-                city = st.text_input("City*")
-                password = st.text_input("Password*", type="password")
-            
-            # Center the Create Account button
-            st.markdown("<br>", unsafe_allow_html=True)
-            col_left, col_center, col_right = st.columns([1, 2, 1])
-            with col_center:
-                submit = st.form_submit_button("Create Account", use_container_width=True)
-            
-            if submit:
-                if all([username, email, password, first_name, last_name, phone, country, city]):
-                    success, message = create_user(username, email, password, first_name, last_name, phone, country, city)
+        _render_register_form("register_tab")
+
+def _render_register_form(key):
+    """Registration form shared by the login page's Register tab and the Register page"""
+    with st.form(f"register_form_{key}"):
+        col1, col2 = st.columns(2)
+        with col1:
+            first_name = st.text_input("First Name*")
+            last_name = st.text_input("Last Name*")
+            username = st.text_input("Username*")
+            email = st.text_input("Email*")
+        with col2:
+            phone = st.text_input("Phone*")
+            country = st.text_input("Country*")
+            city = st.text_input("City*")
+            password = st.text_input("Password*", type="password")
+        
+        # Center the Create Account button
+        st.markdown("<br>", unsafe_allow_html=True)
+        col_left, col_center, col_right = st.columns([1, 2, 1])
+        with col_center:
+            submit = st.form_submit_button("Create Account", use_container_width=True)
+        
+        if submit:
+            if all([username, email, password, first_name, last_name, phone, country, city]):
+                success, message = create_user(username, email, password, first_name, last_name, phone, country, city)
+                if success:
+                    st.success(message)
+                    st.info("Account created! You can now login with your credentials")
+                    # Auto-switch to login tab after successful registration
+                    st.session_state.current_page = "Login"
+                else:
+                    st.error(message)
+            else:
+                st.error("Please fill in all required fields")
+
+def filtered_card_rows(search_term, price_filter, stock_filter):
+    """
+    CARD_COLUMNS tuples of the cached products passing the main page filters,
+    or None when there are no products at all
+    """
+    df = cached_products_df()
+    
+    if df.empty:
+        return None
+    
+    pattern = compile_search(search_term) if search_term else None
+    ranges = []
+    if price_filter != "All":
+        ranges.append(('Price', PRICE_BOUNDS[price_filter]))
+    if stock_filter != "All":
+        ranges.append(('Stock', STOCK_BOUNDS[stock_filter]))
+    
+    # A lone price or stock filter needs no mask: its binary search already
+    # yields the matching rows, which only need putting back in catalog order
+    if pattern is None and len(ranges) == 1:
+        rows = range_rows(*ranges[0])
+        return list(df.iloc[np.sort(rows)][CARD_COLUMNS].itertuples(index=False, name=None))
+    
+    # Apply filters: the first active filter's mask is the starting mask and the
+    # others AND into it; the cached frame is indexed once at the end, and not
+    # at all when no filter is active
+    mask = None
+    
+    # Name search filter
+    if pattern is not None:
+        mask = df['_name_lower'].str.contains(pattern, na=False).to_numpy()
+    
+    # Price and stock filters: on a large catalog with both active, one fused pass over both columns
+    if len(ranges) == 2 and use_fused_range_filter(len(df)):
+        if mask is None:
+            mask = np.ones(len(df), dtype=bool)
+        and_price_stock_mask(mask, df['Price'].to_numpy(), df['Stock'].to_numpy(),
+                             PRICE_BOUNDS[price_filter], STOCK_BOUNDS[stock_filter])
+    else:
+        for column, bounds in ranges:
+            if mask is None:
+                mask = range_mask(column, bounds)
+            else:
+                mask &= range_mask(column, bounds)
+    
+    filtered_df = df if mask is None else df.iloc[np.flatnonzero(mask)]
+    
+    # Plain tuples: no per-row Series boxing as with iterrows()
+    return list(filtered_df[CARD_COLUMNS].itertuples(index=False, name=None))
+
+def _toggle_favorite(product_id, fav_ids):
+    """Favorite button callback; keeps the grid's fav_ids in step and leaves the outcome for the card to show"""
+    if product_id in fav_ids:
+        success, message = remove_from_favorites(st.session_state.user_id, product_id)
+        if success:
+            fav_ids.discard(product_id)
+    else:
+        success, message = add_to_favorites(st.session_state.user_id, product_id)
+        if success:
+            fav_ids.add(product_id)
+    st.session_state.favorite_flash = (product_id, success, message)
+
+@st.fragment
+def _render_product_card(product, fav_ids, favorites_view=False):
+    """
+    One product card. Its buttons rerun only this fragment, not the product
+    query, the filters and the rest of the grid; product is a plain tuple of
+    CARD_COLUMNS and fav_ids is the caller's set of favorite product ids,
+    updated in place when the favorite is toggled
+    """
+    product_id, name, price_text, stock, rating_text, category = product
+    
+    # One markdown element per card (trailing double spaces are line breaks)
+    st.markdown(
+        f"**{name}**\n\n"
+        f"💰 **{price_text}**  \n"
+        f"📦 **Stock: {stock}**  \n"
+        f"⭐ Rating: {rating_text}  \n"
+        f"🏷️ {category}"
+    )
+    
+    # Action buttons - only show if logged in
+    if st.session_state.logged_in:
+        key_prefix = "fav_" if favorites_view else ""
+        btn_col1, btn_col2 = st.columns(2)
+        with btn_col1:
+            if st.button(f"🛒 Add to Order", key=f"{key_prefix}add_{product_id}"):
+                if stock > 0:
+                    success, message = add_item_to_temp_order(st.session_state.user_id, product_id)
                     if success:
                         st.success(message)
-                        st.info("Account created! You can now login with your credentials")
-                        # Auto-switch to login tab after successful registration
-                        st.session_state.current_page = "Login"
                     else:
                         st.error(message)
                 else:
-                    st.error("Please fill in all required fields")
+                    st.error("Out of stock!")
+        
+        with btn_col2:
+            if favorites_view:
+                if st.button("💔 Remove", key=f"fav_remove_{product_id}"):
+                    success, message = remove_from_favorites(st.session_state.user_id, product_id)
+                    if success:
+                        st.rerun()  # the card leaves the favorites grid
+                    else:
+                        st.error(message)
+            else:
+                # The callback flips the favorite before this fragment reruns, so the label is already current
+                is_fav = product_id in fav_ids
+                st.button(f"{'💖' if is_fav else '🤍'} Fav", key=f"fav_{product_id}",
+                          on_click=_toggle_favorite, args=(product_id, fav_ids))
+                flash = st.session_state.get('favorite_flash')
+                if flash and flash[0] == product_id:
+                    del st.session_state['favorite_flash']
+                    (st.success if flash[1] else st.error)(flash[2])
+    else:
+        # Show login prompt for non-logged users
+        st.info("🔐 Login to add to cart and favorites")
+    
+    st.markdown("---")
 
 def main_page():
     """Main page with product catalog and search - accessible to all users"""
@@ -146,105 +379,37 @@ def main_page():
     with search_col3:
         stock_filter = st.selectbox("Stock Filter", ["All", "In Stock (>0)", "Low Stock (<10)", "High Stock (>50)"])
     
-    # Get and filter products
-    products = get_products()
+    # Filtered card rows, recomputed only when the filters or the product data changed;
+    # reruns from anything else (card buttons, navigation) reuse the last result
+    signature = (search_term, price_filter, stock_filter, get_products_version())
+    last_signature, rows = st.session_state.get('main_grid_cache', (None, None))
+    if signature != last_signature:
+        rows = filtered_card_rows(search_term, price_filter, stock_filter)
+        if rows is not None:
+            st.session_state.main_grid_cache = (signature, rows)
     
-    if not products:
+    if rows is None:
         st.warning("No products available")
         return
     
-    # Convert to DataFrame for easier filtering
-    if products:
-        df = pd.DataFrame(products)
-        if len(df.columns) >= 7:
-            df.columns = ['ID', 'Name', 'Description', 'Price', 'Category', 'Stock', 'Rating']
-        else:
-            st.error("Product data format error")
-            return
-    
-    # Apply filters
-    filtered_df = df.copy()
-    
-    # Name search filter
-    if search_term:
-        search_terms = [term.strip().lower() for term in search_term.split(',')]
-        mask = filtered_df['Name'].str.lower().str.contains('|'.join(search_terms), na=False)
-        filtered_df = filtered_df[mask]
-    
-    # Price filter
-    if price_filter != "All":
-        if price_filter == "< $50":
-            filtered_df = filtered_df[filtered_df['Price'] < 50]
-        elif price_filter == "$50-$100":
-            filtered_df = filtered_df[(filtered_df['Price'] >= 50) & (filtered_df['Price'] <= 100)]
-        elif price_filter == "$100-$200":
-            filtered_df = filtered_df[(filtered_df['Price'] >= 100) & (filtered_df['Price'] <= 200)]
-        elif price_filter == "> $200":
-            filtered_df = filtered_df[filtered_df['Price'] > 200]
-    
-    # Stock filter
-    if stock_filter != "All":
-        if stock_filter == "In Stock (>0)":
-            filtered_df = filtered_df[filtered_df['Stock'] > 0]
-        elif stock_filter == "Low Stock (<10)":
-            filtered_df = filtered_df[filtered_df['Stock'] < 10]
-        elif stock_filter == "High Stock (>50)":
-            filtered_df = filtered_df[filtered_df['Stock'] > 50]
-    
     # Display results
-    if len(filtered_df) == 0:
+    if not rows:
         st.warning("🔍 No products found matching your search criteria.")
         st.info("Try adjusting your search terms or filters.")
     else:
-        st.markdown(f"#### 📦 Available Items ({len(filtered_df)} products)")
+        st.markdown(f"#### 📦 Available Items ({len(rows)} products)")
+        
+        # One favorites query for the whole grid instead of one per card; a mutable
+        # set so the card fragments can keep it in step with their own toggles
+        fav_ids = set(get_user_favorite_ids(st.session_state.user_id)) if st.session_state.logged_in else set()
         
         # Display products in grid format
         cols_per_row = 3
-        for i in range(0, len(filtered_df), cols_per_row):
+        for i in range(0, len(rows), cols_per_row):
             cols = st.columns(cols_per_row)
-            current_batch = filtered_df[i:i+cols_per_row]
-            for j, (idx, product) in enumerate(current_batch.iterrows()):
-                if j < len(cols):
-                    with cols[j]:
-                        st.markdown(f"**{product['Name']}**")
-                        st.write(f"💰 **${product['Price']:.2f}**")
-                        st.write(f"📦 **Stock: {product['Stock']}**")
-                        st.write(f"⭐ Rating: {product['Rating']}/5")
-                        st.write(f"🏷️ {product['Category']}")
-                        
-                        # Action buttons - only show if logged in
-                        if st.session_state.logged_in:
-                            btn_col1, btn_col2 = st.columns(2)
-                            with btn_col1:
-                                if st.button(f"🛒 Add to Order", key=f"add_{product['ID']}"):
-                                    if product['Stock'] > 0:
-                                        success, message = add_item_to_temp_order(st.session_state.user_id, product['ID'])
-                                        if success:
-                                            st.success(message)
-                                            st.rerun()
-                                        else:
-                                            st.error(message)
-                                    else:
-                                        st.error("Out of stock!")
-                            
-                            with btn_col2:
-                                is_fav = is_favorite(st.session_state.user_id, product['ID'])
-                                if st.button(f"{'💖' if is_fav else '🤍'} Fav", key=f"fav_{product['ID']}"):
-                                    if is_fav:
-                                        success, message = remove_from_favorites(st.session_state.user_id, product['ID'])
-                                    else:
-                                        success, message = add_to_favorites(st.session_state.user_id, product['ID'])
-                                    
-                                    if success:
-                                        st.success(message)
-                                        st.rerun()
-                                    else:
-                                        st.error(message)
-                        else:
-                            # Show login prompt for non-logged users
-                            st.info("🔐 Login to add to cart and favorites")
-                        
-                        st.markdown("---")
+            for j, product in enumerate(rows[i:i+cols_per_row]):
+                with cols[j]:
+                    _render_product_card(product, fav_ids)
 
 def favorites_page():
     """User's favorite items page"""
@@ -259,50 +424,17 @@ def favorites_page():
     st.markdown(f"#### You have {len(favorites)} favorite items")
     
     # Display favorites in same format as main page
-    if favorites:
-        df = pd.DataFrame(favorites)
-        if len(df.columns) >= 7:
-            df.columns = ['ID', 'Name', 'Description', 'Price', 'Category', 'Stock', 'Rating']
-        else:
-            st.error("Favorites data format error")
-            return
+    df = products_frame(favorites)
+    
+    fav_ids = set(df['ID'])
     
+    rows = list(df[CARD_COLUMNS].itertuples(index=False, name=None))
     cols_per_row = 3
-    for i in range(0, len(df), cols_per_row):
+    for i in range(0, len(rows), cols_per_row):
         cols = st.columns(cols_per_row)
-        current_batch = df[i:i+cols_per_row]
-        for j, (idx, product) in enumerate(current_batch.iterrows()):
-            if j < len(cols):
-                with cols[j]:
-                    st.markdown(f"**{product['Name']}**")
-                    st.write(f"💰 **${product['Price']:.2f}**")
-                    st.write(f"📦 **Stock: {product['Stock']}**")
-                    st.write(f"⭐ Rating: {product['Rating']}/5")
-                    st.write(f"🏷️ {product['Category']}")
-                    
-                    btn_col1, btn_col2 = st.columns(2)
-                    with btn_col1:
-                        if st.button(f"🛒 Add to Order", key=f"fav_add_{product['ID']}"):
-                            if product['Stock'] > 0:
-                                success, message = add_item_to_temp_order(st.session_state.user_id, product['ID'])
-                                if success:
-                                    st.success(message)
-                                    st.rerun()
-                                else:
-                                    st.error(message)
-                            else:
-                                st.error("Out of stock!")
-                    
-                    with btn_col2:
-                        if st.button("💔 Remove", key=f"fav_remove_{product['ID']}"):
-                            success, message = remove_from_favorites(st.session_state.user_id, product['ID'])
-                            if success:
-                                st.success(message)
-                                st.rerun()
-                            else:
-                                st.error(message)
-                    
-                    st.markdown("---")
+        for j, product in enumerate(rows[i:i+cols_per_row]):
+            with cols[j]:
+                _render_product_card(product, fav_ids, favorites_view=True)
 
 def order_page():
     """Order management page with TEMP/CLOSE orders"""
@@ -311,8 +443,8 @@ def order_page():
     # Get temp order
     temp_order = get_temp_order(st.session_state.user_id)
     
-    # Get all orders (combined from database and file)
-    all_orders = get_combined_user_orders(st.session_state.user_id)
+    # Get completed orders (combined from database and file; filtered in SQL)
+    closed_orders = get_combined_user_orders(st.session_state.user_id, status='CLOSE')
     
     if temp_order:
         st.markdown("### 🚧 Current Order (TEMP)")
@@ -345,23 +477,27 @@ def order_page():
         # Display items in temp order
         if temp_order['items']:
             st.markdown("**Items in Order:**")
-            for item in temp_order['items']:
-                product_id, name, quantity, price, stock = item
-                col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-                with col1:
-                    st.write(f"**{name}**")
-                with col2:
-                    st.write(f"Qty: {quantity}")
-                with col3:
-                    st.write(f"${price:.2f}")
-                with col4:
-                    if st.button("🗑️", key=f"remove_{product_id}"):
-                        success, message = remove_item_from_temp_order(st.session_state.user_id, product_id)
-                        if success:
-                            st.success(message)
-                            st.rerun()
-                        else:
-                            st.error(message)
+            # One table plus a single remove control instead of a row of widgets per item
+            items_df = pd.DataFrame(temp_order['items'], columns=['Product ID', 'Name', 'Qty', 'Price', 'Stock'])
+            st.dataframe(
+                items_df[['Name', 'Qty', 'Price']],
+                hide_index=True,
+                use_container_width=True,
+                column_config={'Price': st.column_config.NumberColumn(format="$%.2f")},
+            )
+            
+            item_names = dict(zip(items_df['Product ID'], items_df['Name']))
+            remove_col1, remove_col2 = st.columns([3, 1])
+            with remove_col1:
+                product_id = st.selectbox("Remove item", list(item_names), format_func=item_names.get)
+            with remove_col2:
+                if st.button("🗑️ Remove", key="remove_item"):
+                    success, message = remove_item_from_temp_order(st.session_state.user_id, product_id)
+                    if success:
+                        st.success(message)
+                        st.rerun()
+                    else:
+                        st.error(message)
             
             # Shipping address and purchase
             st.markdown("**Complete Your Order:**")
@@ -407,12 +543,11 @@ def order_page():
     
     # Display order history
     st.markdown("### 📋 Order History")
-    closed_orders = [order for order in all_orders if order.get('status') == 'CLOSE']
-    
     if not closed_orders:
         st.info("No completed orders yet")
     else:
         st.success(f"Found {len(closed_orders)} completed orders")
+        db_items = None  # fetched once, only if some order has no saved items
         for order in closed_orders:
             order_id = order.get('order_id')
             total_amount = order.get('total_amount', 0)
@@ -426,39 +561,30 @@ def order_page():
                 st.write(f"**Shipping Address:** {shipping_address}")
                 st.write(f"**Date:** {created_at}")
                 
-                # Get order items
-                if 'items' in order and order['items']:
+                # Order items: saved with the file history, else from the one batched query
+                if order.get('items'):
+                    items = [
+                        (item.get('product_id', 'N/A'), item.get('name', 'N/A'), item.get('quantity', 0),
+                         item.get('price', 0), item.get('subtotal', 0))
+                        for item in order['items']
+                    ]
+                else:
+                    if db_items is None:
+                        db_items = get_user_order_items(st.session_state.user_id, status='CLOSE')
+                    items = db_items.get(order_id)
+                
+                if items:
                     st.markdown("**Items:**")
-                    items_data = []
-                    for item in order['items']:
-                        items_data.append([
-                            item.get('product_id', 'N/A'),
-                            item.get('name', 'N/A'),
-                            item.get('quantity', 0),
-                            f"${item.get('price', 0):.2f}",
-                            f"${item.get('subtotal', 0):.2f}"
-                        ])
-                    if items_data:
-                        items_df = pd.DataFrame(items_data)
-                        if len(items_df.columns) >= 5:
-                            items_df.columns = ['Product ID', 'Name', 'Quantity', 'Price', 'Subtotal']
-                        else:
-                            items_df = pd.DataFrame(items_data)
-                    st.dataframe(items_df, hide_index=True)
+                    st.dataframe(
+                        pd.DataFrame(items, columns=['Product ID', 'Name', 'Quantity', 'Price', 'Subtotal']),
+                        hide_index=True,
+                        column_config={
+                            'Price': st.column_config.NumberColumn(format="$%.2f"),
+                            'Subtotal': st.column_config.NumberColumn(format="$%.2f"),
+                        },
+                    )
                 else:
-                    # Fallback to database lookup
-                    items = get_order_items(order_id)
-                    if items:
-                        st.markdown("**Items:**")
-                        if items:
-                            items_df = pd.DataFrame(items)
-                            if len(items_df.columns) >= 5:
-                                items_df.columns = ['Product ID', 'Name', 'Quantity', 'Price', 'Subtotal']
-                            else:
-                                items_df = pd.DataFrame(items)
-                        st.dataframe(items_df, hide_index=True)
-                    else:
-                        st.info("No items found for this order")
+                    st.info("No items found for this order")
 
 def chat_page():
     """ChatGPT assistant page with 5 prompt limit"""
@@ -473,11 +599,12 @@ def chat_page():
     
     # Display chat history
     if st.session_state.chat_history:
-        st.markdown("### 💬 Chat History")
-        for i, (user_msg, ai_msg) in enumerate(st.session_state.chat_history):
-            st.markdown(f"**You:** {user_msg}")
-            st.markdown(f"**AI Assistant:** {ai_msg}")
-            st.markdown("---")
+        # One markdown element for the whole history instead of three per turn
+        turns = [
+            f"**You:** {user_msg}\n\n**AI Assistant:** {ai_msg}\n\n---\n\n"
+            for user_msg, ai_msg in st.session_state.chat_history
+        ]
+        st.markdown("### 💬 Chat History\n\n" + "".join(turns))
     
     # Chat input
     if remaining_prompts > 0:
@@ -488,16 +615,13 @@ def chat_page():
         if st.button("Send Question", type="primary"):
             if user_question.strip():
                 # Get products for context
-                products = get_products()
-                product_context = ""
-                if products:
-                    product_list = [f"- {p[1]}: ${p[3]:.2f}, Stock: {p[5]}" for p in products[:10]]
-                    product_context = "Available products:\n" + "\n".join(product_list)
+                product_context = chat_product_context()
                 
                 # Get AI response
                 try:
                     context = f"You are a helpful shopping assistant. Answer questions about these products: {product_context}\n\nUser question: {user_question}"
-                    ai_response = get_chatbot_response(context)
+                    st.markdown("**AI Assistant:**")
+                    ai_response = st.write_stream(get_chatbot_response_stream(context))
                     
                     # Update session state
                     st.session_state.chat_history.append((user_question, ai_response))
@@ -512,6 +636,20 @@ def chat_page():
     else:
         st.info("Chat limit reached. Login again to reset your prompt count.")
 
+# Button callbacks: state changes run before the rerun the click triggers, so
+# the page renders once with the new state instead of twice via st.rerun()
+def _go_to(page):
+    st.session_state.current_page = page
+
+def _logout():
+    st.session_state.logged_in = False
+    st.session_state.user_id = None
+    st.session_state.user_info = None
+    st.session_state.current_page = "Main"
+    st.session_state.chat_prompts_count = 0
+    st.session_state.chat_history = []
+    st.session_state.order_history = []  # Clear order history on logout
+
 def user_menu():
     """User menu in sidebar"""
     with st.sidebar:
@@ -519,14 +657,7 @@ def user_menu():
             user = st.session_state.user_info
             st.success(f"👤 Welcome, {user['first_name']}")
             
-            if st.button("🚪 Logout"):
-                st.session_state.logged_in = False
-                st.session_state.user_id = None
-                st.session_state.user_info = None
-                st.session_state.chat_prompts_count = 0
-                st.session_state.chat_history = []
-                st.session_state.order_history = []  # Clear order history on logout
-                st.rerun()
+            st.button("🚪 Logout", on_click=_logout)
             
             # Delete account section
             st.markdown("---")
@@ -569,24 +700,16 @@ def navigation():
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            if st.button("🏠 Main Page", use_container_width=True):
-                st.session_state.current_page = "Main"
-                st.rerun()
+            st.button("🏠 Main Page", use_container_width=True, on_click=_go_to, args=("Main",))
         
         with col2:
-            if st.button("📦 Orders", use_container_width=True):
-                st.session_state.current_page = "Orders"
-                st.rerun()
+            st.button("📦 Orders", use_container_width=True, on_click=_go_to, args=("Orders",))
         
         with col3:
-            if st.button("💖 Favorites", use_container_width=True):
-                st.session_state.current_page = "Favorites"
-                st.rerun()
+            st.button("💖 Favorites", use_container_width=True, on_click=_go_to, args=("Favorites",))
         
         with col4:
-            if st.button("🤖 AI Chat", use_container_width=True):
-                st.session_state.current_page = "Chat"
-                st.rerun()
+            st.button("🤖 AI Chat", use_container_width=True, on_click=_go_to, args=("Chat",))
 
 def main():
     """Main application with enhanced navigation"""
@@ -603,53 +726,31 @@ def main():
             col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
             
             with col1:
-                if st.button("🏠 Main", key="nav_main"):
-                    st.session_state.current_page = "Main"
-                    st.rerun()
+                st.button("🏠 Main", key="nav_main", on_click=_go_to, args=("Main",))
             
             with col2:
-                if st.button("📦 Orders", key="nav_orders"):
-                    st.session_state.current_page = "Orders" 
-                    st.rerun()
+                st.button("📦 Orders", key="nav_orders", on_click=_go_to, args=("Orders",))
             
             with col3:
-                if st.button("💖 Favorites", key="nav_favorites"):
-                    st.session_state.current_page = "Favorites"
-                    st.rerun()
+                st.button("💖 Favorites", key="nav_favorites", on_click=_go_to, args=("Favorites",))
             
             with col4:
-                if st.button("💬 Chat", key="nav_chat"):
-                    st.session_state.current_page = "Chat"
-                    st.rerun()
+                st.button("💬 Chat", key="nav_chat", on_click=_go_to, args=("Chat",))
         else:
             # Simple navigation for non-logged users
-            if st.button("🏠 Browse Products", key="nav_main_guest"):
-                st.session_state.current_page = "Main"
-                st.rerun()
+            st.button("🏠 Browse Products", key="nav_main_guest", on_click=_go_to, args=("Main",))
     
     with nav_col2:
         if not st.session_state.logged_in:
-            if st.button("🔐 Login", key="show_login"):
-                st.session_state.current_page = "Login"
-                st.rerun()
+            st.button("🔐 Login", key="show_login", on_click=_go_to, args=("Login",))
         else:
             st.write(f"👋 {st.session_state.user_info['first_name']}")
     
     with nav_col3:
         if not st.session_state.logged_in:
-            if st.button("📝 Register", key="show_register"):
-                st.session_state.current_page = "Register"
-                st.rerun()
+            st.button("📝 Register", key="show_register", on_click=_go_to, args=("Register",))
         else:
-            if st.button("🚪 Logout", key="nav_logout"):
-                # Reset session state
-                st.session_state.logged_in = False
-                st.session_state.user_id = None
-                st.session_state.user_info = None
-                st.session_state.current_page = "Main"
-                st.session_state.chat_prompts_count = 0
-                st.session_state.chat_history = []
-                st.rerun()
+            st.button("🚪 Logout", key="nav_logout", on_click=_logout)
     
     st.markdown("---")
     
@@ -693,38 +794,7 @@ def register_page():
     """Dedicated registration page"""
     st.title("📝 Create New Account")
     
-    with st.form("register_form"):
-        col1, col2 = st.columns(2)
-        with col1:
-            first_name = st.text_input("First Name")
-            last_name = st.text_input("Last Name")
-            username = st.text_input("Username")
-            password = st.text_input("Password", type="password")
-        
-        with col2:
-            email = st.text_input("Email")
-            phone = st.text_input("Phone")
-            country = st.text_input("Country")
-            city = st.text_input("City")
-        
-        submit = st.form_submit_button("Create Account", type="primary")
-        
-        if submit:
-            if all([first_name, last_name, username, password, email, phone, country, city]):
-                success, message = create_user(
-                    first_name, last_name, username, password, 
-                    email, phone, country, city
-                )
-                if success:
-                    st.success(message)
-                    st.info("Account created successfully! You can now login.")
-                    if st.button("Go to Login"):
-                        st.session_state.current_page = "Login"
-                        st.rerun()
-                else:
-                    st.error(message)
-            else:
-                st.error("Please fill in all fields")
+    _render_register_form("register_page")
 
 def profile_page():
     """User profile and address management page"""
@@ -1,11 +1,13 @@
 """
 Enhanced order management with TEMP/CLOSE status system
 """
-from database import get_connection
+from database import get_connection, db_cursor, invalidate_products_cache
 import logging
 from datetime import datetime
 import json
 import os
+import itertools
+import operator
 
 logger = logging.getLogger(__name__)
 
@@ -226,6 +228,7 @@ def complete_order(user_id, shipping_address):
         conn.commit()
         cursor.close()
         conn.close()
+        invalidate_products_cache()
         
         # Save completed order to persistent file
         save_completed_order(user_id, order_id, shipping_address, order['total_amount'], order['items'])
@@ -289,6 +292,34 @@ def get_order_items(order_id):
         logger.error(f"Error getting order items: {e}")
         return []
 
+def get_user_order_items(user_id, status=None):
+    """Get items of all user's orders (all or filtered by status) in one query, as {order_id: [items]}"""
+    try:
+        query = """
+            SELECT oi.order_id, oi.product_id, p.name, oi.quantity, oi.price, 
+                   (oi.quantity * oi.price) as subtotal
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            JOIN products p ON oi.product_id = p.id
+            WHERE o.user_id = %s
+        """
+        params = [user_id]
+        if status:
+            query += " AND o.status = %s"
+            params.append(status)
+        with db_cursor() as cursor:
+            cursor.execute(query + " ORDER BY oi.order_id", params)
+            rows = cursor.fetchall()
+        
+        return {
+            order_id: [row[1:] for row in order_rows]
+            for order_id, order_rows in itertools.groupby(rows, key=operator.itemgetter(0))
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting order items: {e}")
+        return {}
+
 def load_order_history():
     """Load order history from file"""
     try:
@@ -409,14 +440,14 @@ def sync_orders_to_database(user_id, file_orders):
     except Exception as e:
         logger.error(f"Error syncing orders to database: {e}")
 
-def get_combined_user_orders(user_id):
-    """Get user orders from both database and file, ensuring consistency"""
+def get_combined_user_orders(user_id, status=None):
+    """Get user orders from both database and file, ensuring consistency (all or filtered by status)"""
     try:
         # Load from file first
         file_orders = load_user_orders_from_file(user_id)
         
         # Get from database
-        db_orders = get_user_orders(user_id)
+        db_orders = get_user_orders(user_id, status)
         
         # Combine and deduplicate
         combined_orders = []
@@ -434,9 +465,9 @@ def get_combined_user_orders(user_id):
             })
         
         # Add file orders not in database
-        db_order_ids = [order[0] for order in db_orders]
+        db_order_ids = {order[0] for order in db_orders}
         for file_order in file_orders:
-            if file_order["order_id"] not in db_order_ids:
+            if file_order["order_id"] not in db_order_ids and status in (None, file_order.get("status")):
                 file_order["source"] = "file"
                 combined_orders.append(file_order)
         
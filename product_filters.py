@@ -0,0 +1,60 @@
+import re
+import functools
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional: pip install numba
+    numba = None
+
+# Filters for the product grid in main_app.
+# They live in an imported module on purpose: Streamlit re-executes the entry
+# script in a fresh namespace on every rerun, so a cache defined there starts
+# empty each time, while module state here lasts for the whole process.
+
+@functools.lru_cache(maxsize=256)
+def compile_search(search_term):
+    """
+    Case-insensitive pattern matching any comma-separated term, compiled once per search string;
+    None when there is no term (blank entries would otherwise match every name)
+    """
+    terms = sorted({term.strip().lower() for term in search_term.split(',')} - {''})
+    if not terms:
+        return None
+    return re.compile('|'.join(re.escape(term) for term in terms))
+
+# Catalog size from which the price and stock filters, when both are active,
+# run as one fused numba pass instead of two binary searches and masks
+NUMBA_MIN_PRODUCTS = 10_000
+
+if numba is not None:
+    @numba.njit(cache=True, boundscheck=False)
+    def _price_stock_kernel(price, stock, price_low, price_low_inclusive, price_high, price_high_inclusive,
+                            stock_low, stock_low_inclusive, stock_high, stock_high_inclusive, out):
+        """out[i] &= price[i] in the price range and stock[i] in the stock range, in one pass"""
+        for i in range(price.shape[0]):
+            p = price[i]
+            s = stock[i]
+            out[i] = (
+                out[i]
+                and (p >= price_low if price_low_inclusive else p > price_low)
+                and (p <= price_high if price_high_inclusive else p < price_high)
+                and (s >= stock_low if stock_low_inclusive else s > stock_low)
+                and (s <= stock_high if stock_high_inclusive else s < stock_high)
+            )
+
+def _kernel_bounds(bounds):
+    low, low_inclusive, high, high_inclusive = bounds
+    return (-np.inf if low is None else float(low), low_inclusive,
+            np.inf if high is None else float(high), high_inclusive)
+
+def use_fused_range_filter(row_count):
+    """Whether and_price_stock_mask is available and worth its call for a catalog this size"""
+    return numba is not None and row_count >= NUMBA_MIN_PRODUCTS
+
+def and_price_stock_mask(mask, price, stock, price_bounds, stock_bounds):
+    """
+    AND a price range and a stock range, each (low, low inclusive, high, high inclusive)
+    with None for unbounded, into mask in place
+    """
+    _price_stock_kernel(price, stock, *_kernel_bounds(price_bounds), *_kernel_bounds(stock_bounds), mask)
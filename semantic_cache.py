@@ -0,0 +1,65 @@
+import re
+import time
+import threading
+import numpy as np
+
+# In-process semantic cache for customer-support answers.
+# Questions are embedded, L2-normalised and matched by cosine similarity, so
+# "track my order" and "where is my package" can share one model response.
+EMBEDDING_MODEL = "text-embedding-3-small"
+SIMILARITY_THRESHOLD = 0.92
+TTL_SECONDS = 3600
+MAX_ENTRIES = 2048
+
+# Long prompts carry their own context (product lists, history) and are not
+# comparable by a single embedding; order numbers, emails and long digit runs
+# are personal and must never be answered from another customer's entry
+MAX_MESSAGE_CHARS = 500
+_PERSONAL_DATA = re.compile(r"\bORD-|\d{4,}|[\w.+-]+@[\w-]+\.[\w.-]+", re.IGNORECASE)
+
+_lock = threading.Lock()
+_vectors = None                      # (MAX_ENTRIES, dim) float32 ring buffer
+_expires_at = np.zeros(MAX_ENTRIES)  # monotonic expiry per slot, 0 = empty
+_responses = [None] * MAX_ENTRIES
+_next_slot = 0
+
+def is_cacheable(message):
+    """
+    Whether a message may be answered from, or stored in, the shared cache
+    """
+    return len(message) <= MAX_MESSAGE_CHARS and not _PERSONAL_DATA.search(message)
+
+async def embed(client, message):
+    """
+    L2-normalised embedding of a message
+    """
+    response = await client.embeddings.create(model=EMBEDDING_MODEL, input=message)
+    vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def lookup(vector):
+    """
+    Return the cached response of the nearest live entry at or above the threshold
+    """
+    with _lock:
+        if _vectors is None:
+            return None
+        similarities = _vectors @ vector
+        similarities[_expires_at < time.monotonic()] = -1.0
+        best = int(np.argmax(similarities))
+        if similarities[best] >= SIMILARITY_THRESHOLD:
+            return _responses[best]
+        return None
+
+def add(vector, response):
+    """
+    Store a response, overwriting the oldest slot once the cache is full
+    """
+    global _vectors, _next_slot
+    with _lock:
+        if _vectors is None:
+            _vectors = np.zeros((MAX_ENTRIES, vector.shape[0]), dtype=np.float32)
+        _vectors[_next_slot] = vector
+        _expires_at[_next_slot] = time.monotonic() + TTL_SECONDS
+        _responses[_next_slot] = response
+        _next_slot = (_next_slot + 1) % MAX_ENTRIES
@@ -0,0 +1,73 @@
+import os
+import re
+import logging
+import numpy as np
+
+try:
+    import onnxruntime
+    from transformers import AutoTokenizer
+except ImportError:  # optional: pip install onnxruntime transformers
+    onnxruntime = None
+    AutoTokenizer = None
+
+logger = logging.getLogger(__name__)
+
+# Local sentiment classifier: int8-quantised DistilBERT fine-tuned on SST-2,
+# served by ONNX Runtime on CPU. Export it once with
+#   optimum-cli export onnx --model distilbert-base-uncased-finetuned-sst-2-english models/distilbert-sst2
+# and quantise model.onnx to models/distilbert-sst2-int8.onnx. When the model
+# file or the runtime is missing, available() is False and callers fall back
+# to the OpenAI classifier.
+MODEL_PATH = os.environ.get("SENTIMENT_MODEL_PATH", "models/distilbert-sst2-int8.onnx")
+TOKENIZER_NAME = os.environ.get("SENTIMENT_TOKENIZER", "distilbert-base-uncased-finetuned-sst-2-english")
+MAX_TOKENS = 256
+
+# SST-2 is binary; a prediction this close to a coin flip is reported as neutral
+NEUTRAL_BELOW = 0.65
+LABELS = ("negative", "positive")
+
+URGENT_PATTERN = re.compile(
+    r"\b(refund|broken|damaged|cancel|asap|urgent|immediately|never arrived|charged twice)\b",
+    re.IGNORECASE,
+)
+
+_session = None
+_tokenizer = None
+_input_names = ()
+
+if onnxruntime is not None and os.path.exists(MODEL_PATH):
+    try:
+        _session = onnxruntime.InferenceSession(MODEL_PATH, providers=["CPUExecutionProvider"])
+        _tokenizer = AutoTokenizer.from_pretrained(TOKENIZER_NAME)
+        _input_names = tuple(i.name for i in _session.get_inputs())
+    except Exception as e:
+        logger.warning(f"Local sentiment model unavailable: {e}")
+        _session = None
+
+def available():
+    """
+    Whether the local model was loaded
+    """
+    return _session is not None
+
+def _urgency(sentiment, message):
+    if URGENT_PATTERN.search(message) or sentiment == "negative":
+        return "high"
+    if sentiment == "neutral" or "?" in message:
+        return "medium"
+    return "low"
+
+def classify(message):
+    """
+    Classify a customer message into the same shape the OpenAI classifier returns:
+    {"sentiment": "positive/neutral/negative", "confidence": 0.0-1.0, "urgency": "low/medium/high"}
+    """
+    encoded = _tokenizer(message, return_tensors="np", truncation=True, max_length=MAX_TOKENS)
+    logits = _session.run(None, {name: encoded[name] for name in _input_names})[0][0]
+    probabilities = np.exp(logits - logits.max())
+    probabilities /= probabilities.sum()
+
+    best = int(probabilities.argmax())
+    confidence = float(probabilities[best])
+    sentiment = LABELS[best] if confidence >= NEUTRAL_BELOW else "neutral"
+    return {"sentiment": sentiment, "confidence": round(confidence, 3), "urgency": _urgency(sentiment, message)}
@@ -35,13 +35,14 @@ setup(
         "uvicorn[standard]>=0.24.0",
         "sqlalchemy>=2.0.23",
         "pymysql>=1.1.0",
+        "DBUtils>=3.1.0",
         "streamlit>=1.28.2",
         "plotly>=5.17.0",
         "pandas>=2.1.4",
         "numpy>=1.25.2",
         "scikit-learn>=1.3.2",
         "openai>=1.3.8",
-        "python-jose[cryptography]>=3.3.0",
+        "PyJWT[crypto]>=2.8.0",
         "passlib[bcrypt]>=1.7.4",
         "pydantic>=2.5.0",
         "pydantic-settings>=2.1.0",
@@ -49,6 +50,8 @@ setup(
         "python-multipart>=0.0.6",
         "cryptography>=41.0.8",
         "bcrypt>=4.1.2",
+        "argon2-cffi>=23.1.0",
+        "aiomysql>=0.2.0",
     ],
     extras_require={
         "dev": [
@@ -61,6 +64,15 @@ setup(
         "production": [
             "gunicorn>=21.2.0",
             "psycopg2-binary>=2.9.9",
+            "asyncpg>=0.29.0",
+            "redis>=5.0.0",
+        ],
+        "sentiment": [
+            "onnxruntime>=1.17.0",
+            "transformers>=4.40.0",
+        ],
+        "numba": [
+            "numba>=0.59.0",
         ],
     },
     entry_points={